@@ -0,0 +1,106 @@
+"""
+Concurrent fact-check throughput, before and after the async pipeline.
+
+Search and LLM calls are replaced by stubs that only wait, so the numbers
+show how many fact checks one process keeps in flight, not upstream speed.
+
+    python benchmarks/factcheck_concurrency.py --checks 200 --threads 16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from factcheck import FactCheckChain
+
+
+class StubResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class StubHTTP:
+    """Tavily stand-in: waits search_latency seconds without blocking the loop"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def apost(self, url, **kwargs):
+        await asyncio.sleep(self.latency)
+        return StubResponse({'results': [
+            {'title': f'Source {i}', 'url': f'https://example.org/{i}', 'content': 'lorem ipsum ' * 50, 'score': 0.8}
+            for i in range(5)
+        ]})
+
+
+class StubModel:
+    """Gemini stand-in"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.latency)
+        return type('Message', (), {'content': '## Verdict\nStub analysis'})()
+
+
+def stub_chain(search_latency, llm_latency):
+    chain = FactCheckChain.__new__(FactCheckChain)
+    chain.tavily_api_key = 'stub'
+    chain.http = StubHTTP(search_latency)
+    chain.model = StubModel(llm_latency)
+    return chain
+
+
+def legacy_check(chain, query, search_latency):
+    """The old request path: blocking search, time.sleep(0.5), one event loop per call"""
+    time.sleep(search_latency)
+    time.sleep(0.5)
+    return asyncio.run(chain.model.ainvoke(query))
+
+
+def run_before(chain, queries, threads, search_latency):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda q: legacy_check(chain, q, search_latency), queries))
+
+
+def run_after(chain, queries):
+    results = asyncio.run(chain.verify_facts(None, queries))
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        raise failures[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checks', type=int, default=200, help='fact checks to run')
+    parser.add_argument('--threads', type=int, default=16, help='request threads for the blocking version')
+    parser.add_argument('--search-latency', type=float, default=0.8, help='seconds per stubbed Tavily search')
+    parser.add_argument('--llm-latency', type=float, default=1.5, help='seconds per stubbed Gemini call')
+    args = parser.parse_args()
+
+    chain = stub_chain(args.search_latency, args.llm_latency)
+    queries = [f'Claim number {i}' for i in range(args.checks)]
+
+    for label, run in (
+        (f'before (blocking, {args.threads} threads)', lambda: run_before(chain, queries, args.threads, args.search_latency)),
+        ('after (async, one event loop)', lambda: run_after(chain, queries)),
+    ):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        print(f'{label:40s} {args.checks} checks in {elapsed:6.2f}s  ->  {args.checks / elapsed:7.1f} checks/s')
+
+
+if __name__ == '__main__':
+    main()
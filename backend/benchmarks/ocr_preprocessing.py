@@ -0,0 +1,103 @@
+"""
+Latency and accuracy of each OCR preprocessing step on sample Bengali images.
+
+Runs every image through increasingly complete preprocessing pipelines
+(nothing, then +exif, +grayscale, ... +crop) and reports preprocessing time,
+recognition time and, for images with a ground-truth sidecar (photo.jpg ->
+photo.txt), the character error rate. Images without a sidecar only report
+Tesseract's mean confidence.
+
+    python benchmarks/ocr_preprocessing.py --images samples/bangla
+    python benchmarks/ocr_preprocessing.py --images samples/bangla --steps exif downscale binarize
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PIL import Image
+from config.settings import Config
+from services.ocr_engine import create_ocr_engine
+from services.ocr_preprocessor import STEPS, OCRPreprocessor
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif'}
+
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(text, truth):
+    text, truth = ' '.join(text.split()), ' '.join(truth.split())
+    return edit_distance(text, truth) / max(1, len(truth))
+
+
+def load_samples(folder):
+    samples = []
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in IMAGE_EXTENSIONS:
+            continue
+        truth_path = os.path.join(folder, stem + '.txt')
+        truth = None
+        if os.path.exists(truth_path):
+            with open(truth_path, encoding='utf-8') as f:
+                truth = f.read()
+        samples.append((os.path.join(folder, name), truth))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', required=True, help='folder of sample images (+ optional .txt ground truth)')
+    parser.add_argument('--steps', nargs='*', default=list(STEPS), help='steps to add one at a time')
+    parser.add_argument('--lang', default=Config.OCR_LANG, help='Tesseract languages')
+    args = parser.parse_args()
+
+    samples = load_samples(args.images)
+    if not samples:
+        sys.exit(f'No images found in {args.images}')
+    engine = create_ocr_engine(args.lang, 1, tessdata_path=Config.TESSDATA_PREFIX, tesseract_cmd=Config.TESSERACT_CMD)
+
+    pipelines = [('raw', [])] + [('+' + step, args.steps[:i + 1]) for i, step in enumerate(args.steps)]
+    print(f"{len(samples)} images, engine: {engine.backend}")
+    print(f"{'pipeline':12s} {'prep ms':>9s} {'ocr ms':>9s} {'total ms':>9s} {'CER':>7s} {'conf':>6s}")
+
+    for label, steps in pipelines:
+        preprocess = OCRPreprocessor(steps, target_dpi=Config.OCR_TARGET_DPI, max_pixels=Config.OCR_MAX_PIXELS)
+        prep_times, ocr_times, errors, confidences = [], [], [], []
+        for path, truth in samples:
+            with Image.open(path) as image:
+                image.load()
+                started = time.perf_counter()
+                prepared = preprocess(image)
+                if prepared.mode not in ('1', 'L', 'RGB', 'RGBA'):
+                    prepared = prepared.convert('RGB')
+                prepared_at = time.perf_counter()
+                text, confidence = engine.recognize(prepared)
+                finished = time.perf_counter()
+
+            prep_times.append((prepared_at - started) * 1000)
+            ocr_times.append((finished - prepared_at) * 1000)
+            if truth is not None:
+                errors.append(character_error_rate(text, truth))
+            if confidence is not None:
+                confidences.append(confidence)
+
+        cer = f"{statistics.mean(errors):7.3f}" if errors else f"{'-':>7s}"
+        conf = f"{statistics.mean(confidences):6.1f}" if confidences else f"{'-':>6s}"
+        prep, ocr = statistics.mean(prep_times), statistics.mean(ocr_times)
+        print(f"{label:12s} {prep:9.1f} {ocr:9.1f} {prep + ocr:9.1f} {cer} {conf}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+PDF text extraction throughput (pages/sec), serial vs. parallel workers.
+
+Without --pdf a synthetic text-layer document of --pages pages is generated
+with PyMuPDF. Pass a real scan to include OCR fallback pages in the numbers.
+
+    python benchmarks/pdf_extraction.py --pages 200 --workers 1 2 4 8
+    python benchmarks/pdf_extraction.py --pdf samples/newspaper.pdf
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.pdf_extractor import PDFExtractor
+
+PARAGRAPH = ('The quick brown fox jumps over the lazy dog while the committee reviews '
+             'the quarterly figures and the river keeps rising after the monsoon rains. ')
+
+
+def synthetic_pdf(path, pages):
+    import pymupdf
+
+    document = pymupdf.open()
+    for number in range(pages):
+        page = document.new_page()
+        page.insert_textbox(page.rect + (50, 50, -50, -50), f'Page {number + 1}\n\n' + PARAGRAPH * 25, fontsize=10)
+    document.save(path)
+    document.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pdf', help='PDF to extract (default: generate one)')
+    parser.add_argument('--pages', type=int, default=200, help='pages in the generated PDF')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1],
+                        help='worker counts to compare')
+    parser.add_argument('--pages-per-task', type=int, default=8)
+    parser.add_argument('--no-ocr', action='store_true', help='skip the OCR fallback for pages without text')
+    args = parser.parse_args()
+
+    path = args.pdf
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'synthetic.pdf')
+        synthetic_pdf(path, args.pages)
+
+    for workers in dict.fromkeys(args.workers):
+        extractor = PDFExtractor(workers=workers, pages_per_task=args.pages_per_task, ocr=not args.no_ocr)
+        if workers > 1:
+            list(extractor.iter_pages(path))  # start the worker processes outside the timing
+        started = time.perf_counter()
+        first_page = None
+        characters = 0
+        for page in extractor.iter_pages(path):
+            if first_page is None:
+                first_page = time.perf_counter() - started
+            characters += len(page['text'])
+        elapsed = time.perf_counter() - started
+        stats = extractor.stats()
+        pages = stats['pages'] // stats['documents']
+        print(f"{workers:2d} workers: {pages} pages in {elapsed:6.2f}s -> {pages / elapsed:7.1f} pages/s  "
+              f"(first page after {first_page * 1000:.0f} ms, {characters} chars)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Near-duplicate question pruning time for growing question counts.
+
+Uses random unit vectors the size of MiniLM embeddings (384) with a share of
+noisy copies mixed in, so no model download is needed; the embedding step
+itself is not timed.
+
+    python benchmarks/question_dedup.py --questions 1000 5000 20000
+    python benchmarks/question_dedup.py --duplicates 0.5 --block-size 512
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from services.question_dedup import find_duplicates
+
+
+def synthetic_vectors(count, duplicate_share, dimensions, rng):
+    originals = count - int(count * duplicate_share)
+    vectors = rng.normal(size=(count, dimensions)).astype(np.float32)
+    copies = rng.integers(0, originals, count - originals)
+    vectors[originals:] = vectors[copies] + rng.normal(scale=0.05, size=(len(copies), dimensions))
+    vectors = vectors[rng.permutation(count)]
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True), originals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--duplicates', type=float, default=0.3, help='share of near-duplicate questions')
+    parser.add_argument('--threshold', type=float, default=0.9)
+    parser.add_argument('--block-size', type=int, default=1024)
+    parser.add_argument('--dimensions', type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for count in args.questions:
+        vectors, originals = synthetic_vectors(count, args.duplicates, args.dimensions, rng)
+        started = time.perf_counter()
+        keep = find_duplicates(vectors, args.threshold, args.block_size)
+        elapsed = time.perf_counter() - started
+        print(f"{count:6d} questions: kept {int(keep.sum()):6d} (expected {originals}) in {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Socket.IO load test: how many concurrent clients and fact-check streams one server process holds.
+
+Start the server first (serve.py for gevent, app.py for the threaded
+development server), then for each --clients count this script connects
+that many Socket.IO clients, broadcasts chat messages to all of them and,
+with --factchecks, queues that many background fact checks whose progress
+events stream to the clients' rooms. Reports connect latency, broadcast
+delivery time, fact-check event delivery and (with --pid) the server's
+threads and memory. Needs python-socketio[asyncio_client] (aiohttp);
+--pid needs psutil.
+
+    python src/serve.py --port 5000 &
+    python benchmarks/socketio_load.py --url http://localhost:5000 --clients 100 500 1000 --pid $!
+    python benchmarks/socketio_load.py --clients 200 --factchecks 20 --query "Dhaka is the capital of Bangladesh"
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+import socketio
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else float('nan')
+
+
+def server_usage(pid):
+    if pid is None:
+        return ''
+    import psutil
+
+    process = psutil.Process(pid)
+    return f", server: {process.num_threads()} threads, {process.memory_info().rss / 2 ** 20:.0f} MB RSS"
+
+
+class LoadClient:
+    def __init__(self, url, transports):
+        self.url = url
+        self.transports = transports
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.messages = asyncio.Queue()
+        self.fact_check_events = 0
+        self.jobs_finished = asyncio.Event()
+        self.connect_seconds = None
+
+        self.sio.on('message', self._on_message)
+        self.sio.on('fact_check_update', self._on_fact_check)
+        self.sio.on('job_update', self._on_job)
+
+    async def _on_message(self, data):
+        await self.messages.put(time.perf_counter())
+
+    async def _on_fact_check(self, data):
+        self.fact_check_events += 1
+
+    async def _on_job(self, data):
+        if data.get('status') in ('done', 'failed', 'cancelled'):
+            self.jobs_finished.set()
+
+    async def connect(self):
+        started = time.perf_counter()
+        await self.sio.connect(self.url, transports=self.transports, wait_timeout=30)
+        self.connect_seconds = time.perf_counter() - started
+
+
+async def connect_all(clients, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def connect(client):
+        async with semaphore:
+            try:
+                await client.connect()
+                return True
+            except Exception:
+                return False
+
+    results = await asyncio.gather(*(connect(client) for client in clients))
+    return [client for client, ok in zip(clients, results) if ok]
+
+
+async def broadcast_round(clients, timeout):
+    """One client sends a chat message; time until every other client has it"""
+    sender, receivers = clients[0], clients[1:]
+    for client in receivers:
+        while not client.messages.empty():
+            client.messages.get_nowait()
+    started = time.perf_counter()
+    await sender.sio.emit('chat_message', {'text': 'load test', 'sent': started})
+
+    async def receive(client):
+        try:
+            return await asyncio.wait_for(client.messages.get(), timeout) - started
+        except asyncio.TimeoutError:
+            return None
+
+    latencies = await asyncio.gather(*(receive(client) for client in receivers))
+    return [latency for latency in latencies if latency is not None]
+
+
+async def fact_check_round(url, clients, count, query, timeout):
+    """Queue count background fact checks, each streaming to its own client's room"""
+    streams = clients[:count]
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as http:
+        async def submit(client):
+            async with http.post(f"{url}/api/factcheck?async=true", json={'query': query},
+                                 headers={'X-Socket-ID': client.sio.get_sid()}) as response:
+                return response.status
+
+        statuses = await asyncio.gather(*(submit(client) for client in streams))
+
+    async def finished(client):
+        try:
+            await asyncio.wait_for(client.jobs_finished.wait(), timeout)
+            return time.perf_counter() - started
+        except asyncio.TimeoutError:
+            return None
+
+    durations = [d for d in await asyncio.gather(*(finished(client) for client in streams)) if d is not None]
+    events = sum(client.fact_check_events for client in streams)
+    return statuses, durations, events
+
+
+async def run(args):
+    transports = ['websocket'] if args.transport == 'websocket' else ['polling']
+    for count in args.clients:
+        clients = [LoadClient(args.url, transports) for _ in range(count)]
+        started = time.perf_counter()
+        connected = await connect_all(clients, args.connect_concurrency)
+        elapsed = time.perf_counter() - started
+        connect_times = [client.connect_seconds * 1000 for client in connected]
+        print(f"{count:5d} clients: {len(connected)} connected in {elapsed:.1f}s "
+              f"(connect p50 {percentile(connect_times, 50):.0f} ms, p95 {percentile(connect_times, 95):.0f} ms)"
+              f"{server_usage(args.pid)}")
+
+        if len(connected) > 1:
+            rounds = []
+            for _ in range(args.broadcasts):
+                rounds.append(await broadcast_round(connected, args.timeout))
+            delivered = [len(latencies) for latencies in rounds]
+            latencies = [latency * 1000 for latencies in rounds for latency in latencies]
+            print(f"       broadcast: {statistics.mean(delivered):.0f}/{len(connected) - 1} delivered per message, "
+                  f"p50 {percentile(latencies, 50):.0f} ms, p95 {percentile(latencies, 95):.0f} ms, "
+                  f"max {max(latencies, default=float('nan')):.0f} ms")
+
+        if args.factchecks and connected:
+            statuses, durations, events = await fact_check_round(
+                args.url, connected, min(args.factchecks, len(connected)), args.query, args.timeout)
+            accepted = sum(status == 202 for status in statuses)
+            print(f"       fact checks: {accepted}/{len(statuses)} accepted, {len(durations)} finished, "
+                  f"{events} progress events, p50 {percentile(durations, 50):.1f}s, "
+                  f"max {max(durations, default=float('nan')):.1f}s{server_usage(args.pid)}")
+
+        await asyncio.gather(*(client.sio.disconnect() for client in connected), return_exceptions=True)
+        await asyncio.sleep(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--transport', choices=['websocket', 'polling'], default='websocket')
+    parser.add_argument('--connect-concurrency', type=int, default=50, help='connection attempts in flight')
+    parser.add_argument('--broadcasts', type=int, default=5, help='chat broadcasts per client count')
+    parser.add_argument('--factchecks', type=int, default=0, help='background fact checks to stream (needs API keys)')
+    parser.add_argument('--query', default='Dhaka is the capital of Bangladesh')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds to wait for deliveries')
+    parser.add_argument('--pid', type=int, help='server process id, to report its threads and memory')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
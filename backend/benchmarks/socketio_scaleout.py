@@ -0,0 +1,223 @@
+"""
+Multi-process Socket.IO scale-out check: emits from one process must reach clients on another.
+
+Starts a message queue (an in-memory fakeredis server unless --message-queue
+points at a real Redis), --servers serve.py processes on consecutive ports
+sharing it and one job database, and a job_worker.py process. The servers
+run with JOB_WORKERS=0, so every job event is emitted by the worker. Then:
+
+  1. --clients-per-server Socket.IO clients connect to every server,
+  2. one client per server broadcasts chat messages, which every client on
+     the other servers must receive,
+  3. each server queues a background fact check for a client connected to
+     the next server, whose job_update events must reach that client (the
+     checks fail without API keys, which still emits them).
+
+Reports delivery and latency and exits non-zero if any event was lost.
+Needs python-socketio[asyncio_client] (aiohttp), redis and, without
+--message-queue, fakeredis.
+
+    python benchmarks/socketio_scaleout.py
+    python benchmarks/socketio_scaleout.py --servers 4 --clients-per-server 50
+    python benchmarks/socketio_scaleout.py --message-queue redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import socketio
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else float('nan')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_redis(port):
+    code = ('import sys; from fakeredis import TcpFakeServer; '
+            'TcpFakeServer(("127.0.0.1", int(sys.argv[1])), server_type="redis").serve_forever()')
+    process = subprocess.Popen([sys.executable, '-c', code, str(port)])
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('fakeredis server did not start')
+
+
+async def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.time() < deadline:
+            try:
+                async with http.get(f"{url}/api/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f'{url} did not become ready')
+
+
+class ScaleOutClient:
+    def __init__(self, server):
+        self.server = server
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.messages = asyncio.Queue()
+        self.jobs = {}
+        self.jobs_changed = asyncio.Event()
+
+        self.sio.on('message', self._on_message)
+        self.sio.on('job_update', self._on_job)
+
+    async def _on_message(self, data):
+        await self.messages.put((data.get('server'), time.perf_counter()))
+
+    async def _on_job(self, data):
+        self.jobs.setdefault(data['job_id'], []).append((data['status'], time.perf_counter()))
+        self.jobs_changed.set()
+
+    async def job_finished(self, job_id):
+        while not any(status in ('done', 'failed', 'cancelled') for status, _ in self.jobs.get(job_id, [])):
+            self.jobs_changed.clear()
+            await self.jobs_changed.wait()
+        return self.jobs[job_id][-1][1]
+
+
+async def broadcast_round(clients, sender_server, timeout):
+    """A client on sender_server broadcasts; latency per client on the other servers"""
+    sender = clients[sender_server][0]
+    receivers = [client for server, group in enumerate(clients) if server != sender_server for client in group]
+    for client in receivers:
+        while not client.messages.empty():
+            client.messages.get_nowait()
+    started = time.perf_counter()
+    await sender.sio.emit('chat_message', {'text': 'scale-out test', 'server': sender_server})
+
+    async def receive(client):
+        try:
+            while True:
+                server, received = await asyncio.wait_for(client.messages.get(), timeout)
+                if server == sender_server:
+                    return received - started
+        except asyncio.TimeoutError:
+            return None
+
+    return await asyncio.gather(*(receive(client) for client in receivers))
+
+
+async def job_round(urls, clients, query, timeout):
+    """Server i queues a fact check for a client on server i + 1; time until the client sees it finish"""
+    async with aiohttp.ClientSession() as http:
+        async def submit(server):
+            target = clients[(server + 1) % len(clients)][0]
+            started = time.perf_counter()
+            async with http.post(f"{urls[server]}/api/factcheck?async=true", json={'query': query},
+                                 headers={'X-Socket-ID': target.sio.get_sid()}) as response:
+                body = await response.json()
+            if response.status != 202:
+                return None
+            try:
+                return await asyncio.wait_for(target.job_finished(body['job_id']), timeout) - started
+            except asyncio.TimeoutError:
+                return None
+
+        return await asyncio.gather(*(submit(server) for server in range(len(urls))))
+
+
+async def check(args, urls):
+    await asyncio.gather(*(wait_ready(url, args.startup_timeout) for url in urls))
+    clients = [[ScaleOutClient(server) for _ in range(args.clients_per_server)] for server in range(len(urls))]
+    await asyncio.gather(*(client.sio.connect(urls[client.server], transports=['websocket'], wait_timeout=30)
+                           for group in clients for client in group))
+    print(f"{len(urls)} servers x {args.clients_per_server} clients connected")
+
+    lost = 0
+    latencies = []
+    for _ in range(args.broadcasts):
+        for server in range(len(urls)):
+            results = await broadcast_round(clients, server, args.timeout)
+            lost += sum(latency is None for latency in results)
+            latencies.extend(latency * 1000 for latency in results if latency is not None)
+    expected = args.broadcasts * len(urls) * (len(urls) - 1) * args.clients_per_server
+    print(f"cross-server broadcast: {len(latencies)}/{expected} delivered, "
+          f"p50 {percentile(latencies, 50):.1f} ms, p95 {percentile(latencies, 95):.1f} ms, "
+          f"max {max(latencies, default=float('nan')):.1f} ms")
+
+    durations = await job_round(urls, clients, args.query, args.timeout)
+    finished = [duration for duration in durations if duration is not None]
+    lost += len(durations) - len(finished)
+    print(f"job events via worker process: {len(finished)}/{len(durations)} clients saw their job finish, "
+          f"mean {statistics.mean(finished) if finished else float('nan'):.2f}s")
+
+    await asyncio.gather(*(client.sio.disconnect() for group in clients for client in group),
+                         return_exceptions=True)
+    return lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servers', type=int, default=3)
+    parser.add_argument('--clients-per-server', type=int, default=10)
+    parser.add_argument('--base-port', type=int, default=5100)
+    parser.add_argument('--message-queue', help='Redis URL; default: a local fakeredis server')
+    parser.add_argument('--broadcasts', type=int, default=5, help='chat broadcasts per server')
+    parser.add_argument('--query', default='Dhaka is the capital of Bangladesh')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds to wait for deliveries')
+    parser.add_argument('--startup-timeout', type=float, default=120, help='seconds to wait for the servers')
+    args = parser.parse_args()
+
+    processes = []
+    workdir = tempfile.mkdtemp(prefix='socketio-scaleout-')
+    try:
+        message_queue = args.message_queue
+        if message_queue is None:
+            port = free_port()
+            processes.append(start_fake_redis(port))
+            message_queue = f'redis://127.0.0.1:{port}/0'
+
+        env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE=message_queue, JOB_WORKERS='0',
+                   JOB_DB=os.path.join(workdir, 'jobs.sqlite3'), SOCKETIO_LOG_LEVEL='WARNING')
+        ports = [args.base_port + i for i in range(args.servers)]
+        for port in ports:
+            processes.append(subprocess.Popen(
+                [sys.executable, os.path.join(SRC, 'serve.py'), '--host', '127.0.0.1', '--port', str(port)],
+                env=env, cwd=workdir, stdout=subprocess.DEVNULL))
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(SRC, 'job_worker.py'), '--workers', '2'],
+            env=env, cwd=workdir, stdout=subprocess.DEVNULL))
+
+        lost = asyncio.run(check(args, [f'http://127.0.0.1:{port}' for port in ports]))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print('OK' if lost == 0 else f'FAILED: {lost} deliveries lost')
+    sys.exit(1 if lost else 0)
+
+
+if __name__ == '__main__':
+    main()
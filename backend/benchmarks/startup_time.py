@@ -0,0 +1,63 @@
+"""
+Server startup cost: time to import app.py, then time to load each model.
+
+Every measurement runs in a fresh interpreter so nothing is already imported.
+With lazy loading the import should only cost Flask and the route setup; the
+models are loaded by --preload (or the first request that needs them).
+
+    python benchmarks/startup_time.py --runs 5
+    python benchmarks/startup_time.py --models birdnet bird_photo
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+IMPORT_SCRIPT = '''
+import time
+started = time.perf_counter()
+import app
+print(time.perf_counter() - started)
+'''
+
+PRELOAD_SCRIPT = '''
+import json, sys
+import app
+from utils.lazy import preload
+names = sys.argv[1:] or None
+print(json.dumps(preload(names)))
+'''
+
+
+def run(script, *args):
+    result = subprocess.run(
+        [sys.executable, '-c', script, *args],
+        cwd=SRC, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to time the import in')
+    parser.add_argument('--models', nargs='*', default=[], help='models to load (default: all registered)')
+    args = parser.parse_args()
+
+    timings = [float(run(IMPORT_SCRIPT)) for _ in range(args.runs)]
+    print(f"import app: median {statistics.median(timings):.2f}s  min {min(timings):.2f}s  max {max(timings):.2f}s"
+          f"  ({args.runs} runs)")
+
+    status = json.loads(run(PRELOAD_SCRIPT, *args.models))
+    for name, model in status.items():
+        if model['loaded']:
+            print(f"{name:20s} loaded in {model['load_seconds']:.2f}s")
+        else:
+            print(f"{name:20s} not loaded: {model['error']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,37 @@
-from flask import Flask, request
+from flask import Flask, Request, request
 from flask_cors import CORS
 from flask_restx import Api, Resource, fields
-from birdnet import analyze_bird, analyzer
-from birdphoto import analyze_bird_photo
-from banglaocr import perform_ocr
+from birdnet import analyze_bird, analyze_bird_batch, analyzer_pool, bird_result_cache, birdnet_analyzer, species_cache
+from birdstream import analyze_bird_stream
+from birdphoto import analyze_bird_photo, photo_batcher_stats, photo_result_cache
+from banglaocr import ocr_engine, ocr_stream_response, perform_ocr
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from factcheck import FactCheckChain
-from asgiref.sync import async_to_sync
+from utils.event_loop import background_loop
+from utils.http_client import outbound_http
+from utils.lazy import LazyModel, model_status, preload
+from config.settings import Config
+import argparse
+import io
+import logging
 import os
+import threading
 import time
+import uuid
 from werkzeug.utils import secure_filename
 from services.file_processor import FileProcessor
-from services.pdf_processor import PDFProcessor
+from services.job_queue import JobQueue
+from services.llm_factory import LLMFactory
 from services.image_processor import ImageProcessor
 
+class InMemoryUploadRequest(Request):
+    """Keep uploaded files in memory (bounded by MAX_CONTENT_LENGTH) instead of spooling to disk"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
 app = Flask(__name__)
+app.request_class = InMemoryUploadRequest
 CORS(app)
 api = Api(app, 
     title='BigGan Mela Analysis API',
@@ -23,23 +40,59 @@ api = Api(app,
     doc='/swagger'
 )
 
-# Configure SocketIO with proper CORS
+logging.basicConfig(level=Config.LOG_LEVEL)
+logging.getLogger().setLevel(Config.LOG_LEVEL)
+logging.getLogger('socketio').setLevel(Config.SOCKETIO_LOG_LEVEL)
+logging.getLogger('engineio').setLevel(Config.SOCKETIO_LOG_LEVEL)
+
+# Configure SocketIO with proper CORS; packet logging is controlled by SOCKETIO_LOG_LEVEL.
+# With SOCKETIO_MESSAGE_QUEUE set, emits are relayed through it to the clients of every server process
 socketio = SocketIO(
     app, 
     cors_allowed_origins="*",
-    async_mode='threading',
-    logger=True,
-    engineio_logger=True
+    async_mode=Config.SOCKETIO_ASYNC_MODE,
+    message_queue=Config.SOCKETIO_MESSAGE_QUEUE,
+    channel=Config.SOCKETIO_CHANNEL,
+    logger=logging.getLogger('socketio.server'),
+    engineio_logger=logging.getLogger('engineio.server')
 )
 
-# Initialize processors
-fact_checker = FactCheckChain(
+# Initialize processors (the fact checker loads its models on first use)
+fact_checker = LazyModel('factcheck', lambda: FactCheckChain(
     tavily_api_key=os.getenv('TAVILY_API_KEY'),
     google_api_key=os.getenv('GOOGLE_API_KEY')
+))
+
+# services.pdf_processor pulls in langchain and langgraph, so it is imported on first use
+def load_pdf_processor():
+    from services.pdf_processor import PDFProcessor
+    return PDFProcessor()
+
+def load_question_generator():
+    from services.pdf_processor import QuestionGenerationSystem
+    return QuestionGenerationSystem(
+        LLMFactory(),
+        llm_provider=Config.QUESTION_GEN_PROVIDER,
+        model=Config.QUESTION_GEN_MODEL
+    )
+
+pdf_processor = LazyModel('pdf_processor', load_pdf_processor)
+question_generator = LazyModel('question_generator', load_question_generator)
+
+# Long fact checks and question generation run as background jobs; progress goes to the client's Socket.IO room
+job_queue = JobQueue(
+    Config.JOB_DB,
+    workers=Config.JOB_WORKERS,
+    retention=Config.JOB_RETENTION,
+    lease=Config.JOB_LEASE,
+    max_attempts=Config.JOB_MAX_ATTEMPTS,
+    emit=socketio.emit
 )
 
+# Set by --preload / PRELOAD_MODELS; /api/ready reports 503 until the warmup finishes
+warmup = {'enabled': False, 'done': False}
+
 file_processor = FileProcessor()
-pdf_processor = PDFProcessor()
 image_processor = ImageProcessor()
 
 # Configuration
@@ -63,6 +116,8 @@ ocr_parser.add_argument('image', location='files', type='FileStorage', required=
 ocr_response_model = api.model('OCRResponse', {
     'text': fields.String(description='Extracted Bengali text from the image'),
     'success': fields.Boolean(description='Whether the OCR was successful'),
+    'confidence': fields.Float(description='Mean word confidence (0-100), when the engine reports it'),
+    'pages': fields.Integer(description='Number of pages recognized, for multi-page images'),
     'error': fields.String(description='Error message if OCR failed')
 })
 
@@ -70,6 +125,13 @@ upload_parser = api.parser()
 upload_parser.add_argument('audio', location='files', type='FileStorage', required=True, help='Audio file (WAV or MP3)')
 upload_parser.add_argument('latitude', location='form', type=float, required=False, help='Latitude of recording location')
 upload_parser.add_argument('longitude', location='form', type=float, required=False, help='Longitude of recording location')
+upload_parser.add_argument('date', location='form', type=str, required=False, help='Recording date in ISO format (e.g. 2025-05-22), defaults to today')
+
+batch_upload_parser = api.parser()
+batch_upload_parser.add_argument('audio', location='files', type='FileStorage', action='append', required=True, help='Audio files (WAV, MP3, FLAC, OGG) or zip archives of them')
+batch_upload_parser.add_argument('latitude', location='form', type=float, required=False, help='Latitude of recording location')
+batch_upload_parser.add_argument('longitude', location='form', type=float, required=False, help='Longitude of recording location')
+batch_upload_parser.add_argument('date', location='form', type=str, required=False, help='Recording date in ISO format (e.g. 2025-05-22), defaults to today')
 
 photo_parser = api.parser()
 photo_parser.add_argument('image', location='files', type='FileStorage', required=True, help='Bird image file (JPG, PNG)')
@@ -79,6 +141,11 @@ file_upload_parser = api.parser()
 file_upload_parser.add_argument('files', location='files', type='FileStorage', action='append', required=True, help='Files to upload (PDF, images)')
 file_upload_parser.add_argument('query', location='form', type=str, required=False, help='Additional query text')
 
+question_parser = api.parser()
+question_parser.add_argument('file', location='files', type='FileStorage', required=True, help='PDF to generate questions from')
+question_parser.add_argument('questions_per_chunk', location='form', type=int, required=False, help='Questions per text chunk (default 3)')
+question_parser.add_argument('priority', location='form', type=int, required=False, help='Higher priority jobs run first (default 0)')
+
 detection_model = api.model('Detection', {
     'species': fields.String(description='Common name of the bird'),
     'confidence': fields.Float(description='Confidence score of the detection'),
@@ -99,6 +166,50 @@ photo_detection_model = api.model('PhotoDetection', {
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def wants_async():
+    """Clients opt into a background job with ?async=true or a 'Prefer: respond-async' header"""
+    return (request.args.get('async', '').lower() in ('1', 'true', 'yes')
+            or 'respond-async' in request.headers.get('Prefer', ''))
+
+def job_priority(value):
+    """A client-supplied job priority as an int; raises ValueError (answered with 400) otherwise"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid priority '{value}', expected an integer")
+
+def job_accepted(job_id):
+    return {'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}, 202
+
+def save_uploads(files, folder):
+    """Save the allowed uploads under folder; returns [(filename, path)]"""
+    os.makedirs(folder, exist_ok=True)
+    saved = []
+    for file in files:
+        if file and file.filename != '' and allowed_file(file.filename):
+            filename = secure_filename(file.filename)
+            unique_filename = f"{int(time.time())}_{uuid.uuid4().hex[:8]}_{filename}"
+            filepath = os.path.join(folder, unique_filename)
+            file.save(filepath)
+            saved.append((filename, filepath))
+    return saved
+
+def remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def birdnet_ready():
+    """Load the BirdNET analyzer on first use; False if it cannot be loaded"""
+    try:
+        birdnet_analyzer.get()
+        return True
+    except Exception as e:
+        print(f"BirdNET analyzer failed to initialize: {e}")
+        return False
+
 @ns.route('/analyze-bird')
 class BirdAnalysis(Resource):
     @ns.expect(upload_parser)
@@ -107,10 +218,38 @@ class BirdAnalysis(Resource):
     @ns.response(500, 'Internal Server Error')
     def post(self):
         """Analyze bird sounds in an audio file"""
-        if analyzer is None:
+        if not birdnet_ready():
             return {'error': 'BirdNET analyzer is not properly initialized. Please check the server logs.'}, 500
         return analyze_bird(request, UPLOAD_FOLDER)
 
+@ns.route('/analyze-bird-batch')
+class BirdBatchAnalysis(Resource):
+    @ns.expect(batch_upload_parser)
+    @ns.response(200, 'Success (NDJSON stream, one line per file)')
+    @ns.response(400, 'Bad Request')
+    @ns.response(500, 'Internal Server Error')
+    def post(self):
+        """Analyze many bird sound clips in one batched pass"""
+        if not birdnet_ready():
+            return {'error': 'BirdNET analyzer is not properly initialized. Please check the server logs.'}, 500
+        return analyze_bird_batch(request, UPLOAD_FOLDER)
+
+@ns.route('/analyze-bird-stream')
+class BirdStreamAnalysis(Resource):
+    @ns.doc(params={
+        'latitude': 'Latitude of recording location',
+        'longitude': 'Longitude of recording location',
+        'date': 'Recording date in ISO format (e.g. 2025-05-22), defaults to today'
+    })
+    @ns.response(200, 'Success (NDJSON stream, one line per detection)')
+    @ns.response(400, 'Bad Request')
+    @ns.response(500, 'Internal Server Error')
+    def post(self):
+        """Analyze a WAV recording of any length as it is uploaded (raw body, chunked transfer encoding supported)"""
+        if not birdnet_ready():
+            return {'error': 'BirdNET analyzer is not properly initialized. Please check the server logs.'}, 500
+        return analyze_bird_stream(request, socketio)
+
 @ns.route('/analyze-bird-photo')
 class BirdPhotoAnalysis(Resource):
     @ns.expect(photo_parser)
@@ -121,6 +260,35 @@ class BirdPhotoAnalysis(Resource):
         """Analyze bird species in a photo"""
         return analyze_bird_photo(request, UPLOAD_FOLDER)
 
+@ns.route('/stats')
+class Stats(Resource):
+    @ns.response(200, 'Success')
+    def get(self):
+        """Cache and pool statistics"""
+        return {
+            'birdnet_species_cache': species_cache.stats(),
+            'birdnet_result_cache': bird_result_cache.stats(),
+            'bird_photo_result_cache': photo_result_cache.stats(),
+            'bird_photo_batcher': photo_batcher_stats(),
+            'ocr_engines': ocr_engine.get().stats() if ocr_engine.loaded else None,
+            'pdf_extraction': pdf_processor.get().stats() if pdf_processor.loaded else None,
+            'outbound_circuits': outbound_http.stats(),
+            'factcheck_semantic_cache': fact_checker.get().cache.stats() if fact_checker.loaded else None,
+            'question_caches': question_generator.get().cache_stats() if question_generator.loaded else None,
+            'jobs': job_queue.stats(),
+            'models': model_status()
+        }
+
+@ns.route('/ready')
+class Ready(Resource):
+    @ns.response(200, 'Ready to serve')
+    @ns.response(503, 'Still warming up, or a preloaded model failed to load')
+    def get(self):
+        """Readiness probe reporting which models are loaded"""
+        models = model_status()
+        ready = not warmup['enabled'] or (warmup['done'] and not any(m['error'] for m in models.values()))
+        return {'ready': ready, 'preload': warmup['enabled'], 'models': models}, 200 if ready else 503
+
 @ns.route('/ocr')
 class OCR(Resource):
     @ns.expect(ocr_parser)
@@ -143,13 +311,34 @@ class OCR(Resource):
         except Exception as e:
             return {'error': str(e), 'success': False}, 500
 
+@ns.route('/ocr-stream')
+class OCRStream(Resource):
+    @ns.expect(ocr_parser)
+    @ns.response(200, 'Success (NDJSON stream, one line per page)')
+    @ns.response(400, 'Bad Request')
+    def post(self):
+        """Extract Bengali text from a multi-page scan or large image, streaming each page as it is recognized"""
+        if 'image' not in request.files:
+            return {'error': 'No image file provided', 'success': False}, 400
+            
+        image_file = request.files['image']
+        if image_file.filename == '':
+            return {'error': 'No selected file', 'success': False}, 400
+            
+        try:
+            return ocr_stream_response(image_file)
+        except Exception as e:
+            return {'error': f'Could not read image: {str(e)}', 'success': False}, 400
+
 @ns.route('/factcheck')
 class FactCheck(Resource):
     @ns.expect(api.model('FactCheckRequest', {
         'query': fields.String(required=True, description='The statement to fact check'),
-        'socket_id': fields.String(description='Socket ID of the client')
+        'socket_id': fields.String(description='Socket ID of the client'),
+        'priority': fields.Integer(description='Job priority with ?async=true; higher runs first (default 0)')
     }))
     @ns.response(200, 'Success')
+    @ns.response(202, 'Queued as a background job (?async=true)')
     @ns.response(400, 'Bad Request')
     @ns.response(500, 'Internal Server Error')
     def post(self):
@@ -165,9 +354,16 @@ class FactCheck(Resource):
             socket_id = request.headers.get('X-Socket-ID')
             print(f"Processing fact check for socket: {socket_id}")
             
-            # Use async_to_sync to handle the coroutine
-            verify_fact_sync = async_to_sync(fact_checker.verify_fact)
-            result = verify_fact_sync(socketio, query, socket_id)
+            if wants_async():
+                try:
+                    priority = job_priority(data.get('priority', 0))
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+                job_id = job_queue.submit('factcheck', {'query': query}, priority, socket_id)
+                return job_accepted(job_id)
+            
+            # Run the coroutine on the shared event loop alongside other fact checks
+            result = background_loop.run(fact_checker.get().verify_fact(socketio, query, socket_id))
             
             return result
             
@@ -175,14 +371,132 @@ class FactCheck(Resource):
             print(f"Error in fact check: {e}")
             return {'error': str(e)}, 500
 
+def extract_file_content(filename, filepath, socket_id):
+    """Text chunks of one saved upload: PDF text, or OCR text for images"""
+    extracted_content = []
+    file_ext = filename.rsplit('.', 1)[1].lower()
+    
+    if file_ext == 'pdf':
+        # Process PDF
+        if socket_id:
+            socketio.emit('fact_check_update', {
+                'type': 'file_processing',
+                'message': f'Extracting text from PDF: {filename}',
+                'status': 'processing_pdf'
+            }, room=socket_id)
+        
+        chunks, chunk_count = pdf_processor.get().process_pdf(filepath)
+        for chunk in chunks:
+            extracted_content.append({
+                'type': 'pdf_text',
+                'content': chunk.page_content,
+                'source': filename,
+                'metadata': chunk.metadata
+            })
+        
+    elif file_ext in ['png', 'jpg', 'jpeg', 'gif']:
+        # Process Image with OCR
+        if socket_id:
+            socketio.emit('fact_check_update', {
+                'type': 'file_processing',
+                'message': f'Extracting text from image: {filename}',
+                'status': 'processing_image'
+            }, room=socket_id)
+        
+        try:
+            with open(filepath, 'rb') as img_file:
+                ocr_result = perform_ocr(img_file)
+                if ocr_result.get('success') and ocr_result.get('text'):
+                    for chunk in pdf_processor.get().chunker.chunk_text(
+                        ocr_result['text'],
+                        {'source': filename, 'ocr_confidence': ocr_result.get('confidence', 0)}
+                    ):
+                        extracted_content.append({
+                            'type': 'image_text',
+                            'content': chunk.page_content,
+                            'source': filename,
+                            'metadata': chunk.metadata
+                        })
+        except Exception as e:
+            print(f"Error processing image {filename}: {e}")
+    
+    return extracted_content
+
+def fact_check_saved_files(saved, query_text, socket_id, job=None):
+    """
+    Fact check the text of saved uploads plus an optional query
+    
+    Args:
+        saved: [(filename, path)] from save_uploads
+        query_text: Extra query text from the form
+        socket_id: Room for progress events
+        job: JobContext when running as a background job (progress and cancellation)
+    
+    Returns:
+        (result, status code)
+    """
+    extracted_content = []
+    processed_files = []
+    
+    for filename, filepath in saved:
+        if job is not None:
+            job.progress(stage='extracting', current=len(processed_files), total=len(saved), file=filename)
+        extracted_content.extend(extract_file_content(filename, filepath, socket_id))
+        processed_files.append({
+            'filename': filename,
+            'type': filename.rsplit('.', 1)[1].lower(),
+            'path': filepath
+        })
+    
+    if not extracted_content and not query_text:
+        return {'error': 'No content could be extracted from files and no query provided'}, 400
+    
+    # Combine all content for fact-checking
+    combined_content = ""
+    if query_text:
+        combined_content += f"Query: {query_text}\n\n"
+    
+    if extracted_content:
+        combined_content += "Extracted Content:\n\n"
+        for content_item in extracted_content:
+            combined_content += f"From {content_item['source']} ({content_item['type']}):\n"
+            combined_content += content_item['content'] + "\n\n"
+    
+    # Emit content processing complete
+    if socket_id:
+        socketio.emit('fact_check_update', {
+            'type': 'content_extracted',
+            'message': f'Successfully extracted content from {len(extracted_content)} sources',
+            'status': 'content_ready'
+        }, room=socket_id)
+    
+    # Now perform fact-checking on the combined content
+    future = background_loop.submit(fact_checker.get().verify_fact(socketio, combined_content, socket_id))
+    if job is not None:
+        job.progress(stage='fact_checking', current=len(processed_files), total=len(saved))
+        result = job.wait(future)
+    else:
+        result = future.result()
+    
+    # Add file processing metadata to result
+    result['file_metadata'] = {
+        'processed_files': len(processed_files),
+        'extracted_sources': len(extracted_content),
+        'files_info': processed_files
+    }
+    
+    return result, 200
+
 @ns.route('/factcheck-files')
 class FactCheckFiles(Resource):
     @ns.expect(file_upload_parser)
     @ns.response(200, 'Success')
+    @ns.response(202, 'Queued as a background job (?async=true)')
     @ns.response(400, 'Bad Request')
     @ns.response(500, 'Internal Server Error')
     def post(self):
         """Process fact-checking with file uploads"""
+        saved = []
         try:
             # Get socket ID from headers
             socket_id = request.headers.get('X-Socket-ID')
@@ -199,6 +513,24 @@ class FactCheckFiles(Resource):
             if not files or all(f.filename == '' for f in files):
                 return {'error': 'No files selected'}, 400
             
+            if wants_async():
+                try:
+                    priority = job_priority(request.form.get('priority', 0))
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+                # The files stay on disk until the job is done with them
+                saved = save_uploads(files, Config.JOB_UPLOAD_FOLDER)
+                if not saved and not query_text:
+                    return {'error': 'No supported files and no query provided'}, 400
+                job_id = job_queue.submit(
+                    'factcheck_files',
+                    {'files': saved, 'query': query_text},
+                    priority,
+                    socket_id
+                )
+                saved = []
+                return job_accepted(job_id)
+            
             # Emit initial status
             if socket_id:
                 socketio.emit('fact_check_update', {
@@ -207,108 +539,8 @@ class FactCheckFiles(Resource):
                     'status': 'processing_files'
                 }, room=socket_id)
             
-            # Process files
-            extracted_content = []
-            processed_files = []
-            
-            for file in files:
-                if file and file.filename != '' and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    timestamp = str(int(time.time()))
-                    unique_filename = f"{timestamp}_{filename}"
-                    filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                    file.save(filepath)
-                    
-                    # Process based on file type
-                    file_ext = filename.rsplit('.', 1)[1].lower()
-                    
-                    if file_ext == 'pdf':
-                        # Process PDF
-                        if socket_id:
-                            socketio.emit('fact_check_update', {
-                                'type': 'file_processing',
-                                'message': f'Extracting text from PDF: {filename}',
-                                'status': 'processing_pdf'
-                            }, room=socket_id)
-                        
-                        chunks, chunk_count = pdf_processor.process_pdf(filepath)
-                        if chunks:
-                            for chunk in chunks:
-                                extracted_content.append({
-                                    'type': 'pdf_text',
-                                    'content': chunk.page_content,
-                                    'source': filename,
-                                    'metadata': chunk.metadata
-                                })
-                        
-                    elif file_ext in ['png', 'jpg', 'jpeg', 'gif']:
-                        # Process Image with OCR
-                        if socket_id:
-                            socketio.emit('fact_check_update', {
-                                'type': 'file_processing',
-                                'message': f'Extracting text from image: {filename}',
-                                'status': 'processing_image'
-                            }, room=socket_id)
-                        
-                        try:
-                            with open(filepath, 'rb') as img_file:
-                                ocr_result = perform_ocr(img_file)
-                                if ocr_result.get('success') and ocr_result.get('text'):
-                                    extracted_content.append({
-                                        'type': 'image_text',
-                                        'content': ocr_result['text'],
-                                        'source': filename,
-                                        'metadata': {'ocr_confidence': ocr_result.get('confidence', 0)}
-                                    })
-                        except Exception as e:
-                            print(f"Error processing image {filename}: {e}")
-                    
-                    processed_files.append({
-                        'filename': filename,
-                        'type': file_ext,
-                        'path': filepath
-                    })
-                    
-                    # Clean up file after processing
-                    try:
-                        os.remove(filepath)
-                    except:
-                        pass
-            
-            if not extracted_content and not query_text:
-                return {'error': 'No content could be extracted from files and no query provided'}, 400
-            
-            # Combine all content for fact-checking
-            combined_content = ""
-            if query_text:
-                combined_content += f"Query: {query_text}\n\n"
-            
-            if extracted_content:
-                combined_content += "Extracted Content:\n\n"
-                for content_item in extracted_content:
-                    combined_content += f"From {content_item['source']} ({content_item['type']}):\n"
-                    combined_content += content_item['content'] + "\n\n"
-            
-            # Emit content processing complete
-            if socket_id:
-                socketio.emit('fact_check_update', {
-                    'type': 'content_extracted',
-                    'message': f'Successfully extracted content from {len(extracted_content)} sources',
-                    'status': 'content_ready'
-                }, room=socket_id)
-            
-            # Now perform fact-checking on the combined content
-            verify_fact_sync = async_to_sync(fact_checker.verify_fact)
-            result = verify_fact_sync(socketio, combined_content, socket_id)
-            
-            # Add file processing metadata to result
-            result['file_metadata'] = {
-                'processed_files': len(processed_files),
-                'extracted_sources': len(extracted_content),
-                'files_info': processed_files
-            }
-            
-            return result
+            saved = save_uploads(files, app.config['UPLOAD_FOLDER'])
+            return fact_check_saved_files(saved, query_text, socket_id)
             
         except Exception as e:
             print(f"Error in file fact check: {e}")
@@ -319,6 +551,102 @@ class FactCheckFiles(Resource):
                     'status': 'error'
                 }, room=socket_id)
             return {'error': str(e)}, 500
+        finally:
+            # Clean up files after processing
+            remove_files(path for _, path in saved)
+
+@ns.route('/generate-questions')
+class GenerateQuestions(Resource):
+    @ns.expect(question_parser)
+    @ns.response(202, 'Queued; poll status_url or listen for job_update/question_generated events')
+    @ns.response(400, 'Bad Request')
+    def post(self):
+        """Generate MCQs from a PDF in a background job"""
+        if 'file' not in request.files or request.files['file'].filename == '':
+            return {'error': 'No PDF file provided'}, 400
+        if not request.files['file'].filename.lower().endswith('.pdf'):
+            return {'error': 'Only PDF files are supported'}, 400
+        try:
+            priority = job_priority(request.form.get('priority', 0))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        
+        saved = save_uploads([request.files['file']], Config.JOB_UPLOAD_FOLDER)
+        filename, path = saved[0]
+        job_id = job_queue.submit(
+            'questions',
+            {
+                'filename': filename,
+                'path': path,
+                'questions_per_chunk': request.form.get('questions_per_chunk', 3, type=int)
+            },
+            priority,
+            request.headers.get('X-Socket-ID')
+        )
+        return job_accepted(job_id)
+
+@ns.route('/jobs/<string:job_id>')
+class Job(Resource):
+    @ns.response(200, 'Job status, progress and (once done) result')
+    @ns.response(404, 'Unknown or expired job')
+    def get(self, job_id):
+        """Poll a background job"""
+        job = job_queue.get(job_id)
+        if job is None:
+            return {'error': 'Job not found'}, 404
+        return job
+    
+    @ns.response(200, 'Cancelled, or cancellation requested for a running job')
+    @ns.response(404, 'Unknown or expired job')
+    @ns.response(409, 'Job already finished')
+    def delete(self, job_id):
+        """Cancel a background job"""
+        job = job_queue.get(job_id)
+        if job is None:
+            return {'error': 'Job not found'}, 404
+        if not job_queue.cancel(job_id):
+            return {'error': f"Job already {job['status']}"}, 409
+        return {'job_id': job_id, 'cancelled': True}
+
+def run_factcheck_job(job):
+    future = background_loop.submit(fact_checker.get().verify_fact(socketio, job.payload['query'], job.socket_id))
+    return job.wait(future)
+
+def run_factcheck_files_job(job):
+    saved = [tuple(item) for item in job.payload['files']]
+    result, status = fact_check_saved_files(saved, job.payload.get('query', ''), job.socket_id, job)
+    if status != 200:
+        raise ValueError(result['error'])
+    return result
+
+def run_question_job(job):
+    chunks, chunk_count = pdf_processor.get().process_pdf(job.payload['path'])
+    if not chunks:
+        raise ValueError(f"No text could be extracted from {job.payload['filename']}")
+    job.progress(stage='chunked', current=0, total=chunk_count)
+    
+    final = None
+    for update in question_generator.get().generate_questions(chunks, job.payload['questions_per_chunk']):
+        if update['status'] != 'in_progress':
+            final = update
+            continue
+        if 'question' in update:
+            job.emit('question_generated', {'job_id': job.id, 'chunk_id': update['chunk_id'], 'question': update['question']})
+        job.progress(stage=update.get('stage', 'questions'), **update['progress'])
+    
+    if final is None or final['status'] == 'error':
+        raise RuntimeError(final['message'] if final else 'Question generation produced no result')
+    return final
+
+def remove_job_files(payload):
+    paths = [path for _, path in payload.get('files', [])]
+    if 'path' in payload:
+        paths.append(payload['path'])
+    remove_files(paths)
+
+job_queue.register('factcheck', run_factcheck_job)
+job_queue.register('factcheck_files', run_factcheck_files_job, cleanup=remove_job_files)
+job_queue.register('questions', run_question_job, cleanup=remove_job_files)
 
 # Socket.IO event handlers
 @socketio.on('connect')
@@ -353,10 +681,32 @@ def handle_message(data):
 def handle_typing(data):
     emit('typing', data, broadcast=True, include_self=False)
 
-if __name__ == '__main__':
-    # Check if BirdNET is properly initialized
-    if analyzer is None:
+def warm_up():
+    """Load every model and start the BirdNET pool workers"""
+    started = time.perf_counter()
+    preload()
+    if birdnet_analyzer.loaded:
+        analyzer_pool.start()
+        print(f"BirdNET analyzer pool ready with {analyzer_pool.workers} workers")
+    else:
         print("WARNING: BirdNET analyzer failed to initialize. Audio analysis will not be available.")
+    warmup['done'] = True
+    print(f"Warmup finished in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='BigGan Mela server')
+    parser.add_argument('--preload', action='store_true', default=Config.PRELOAD_MODELS,
+                        help='Load every model in the background at startup instead of on first use')
+    args = parser.parse_args()
+    
+    if args.preload:
+        # The server answers right away; /api/ready turns 200 once the models are loaded
+        warmup['enabled'] = True
+        threading.Thread(target=warm_up, name='model-warmup', daemon=True).start()
+    
+    # Workers pick up jobs queued before a restart as well
+    job_queue.start()
     
+    # Development server; use serve.py in production
     print("Starting BigGan Mela server with Socket.IO and file upload support...")
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    socketio.run(app, debug=True, host=Config.SERVER_HOST, port=Config.SERVER_PORT, allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -1,30 +1,136 @@
-import pytesseract
 from PIL import Image
-import os
+from flask import Response, stream_with_context
+from config.settings import Config
+from services.ocr_engine import create_ocr_engine
+from services.ocr_pages import OCRPagePool, iter_pages
+from services.ocr_preprocessor import OCRPreprocessor
+from utils.lazy import LazyModel
+import json
+
+# Tesseract engines with ben+eng loaded once, shared by all request threads
+ocr_engine = LazyModel('tesseract', lambda: create_ocr_engine(
+    Config.OCR_LANG,
+    Config.OCR_WORKERS,
+    tessdata_path=Config.TESSDATA_PREFIX,
+    tesseract_cmd=Config.TESSERACT_CMD,
+    timeout=Config.OCR_TIMEOUT
+))
+
+# Orientation, downscale, binarization, deskew and crop before recognition
+ocr_preprocessor = OCRPreprocessor(
+    Config.OCR_PREPROCESS_STEPS,
+    target_dpi=Config.OCR_TARGET_DPI,
+    max_pixels=Config.OCR_MAX_PIXELS
+)
+
+# Multi-page scans and very large images are recognized across processes (started on first use)
+ocr_page_pool = OCRPagePool(
+    Config.OCR_PAGE_WORKERS,
+    Config.OCR_LANG,
+    tessdata_path=Config.TESSDATA_PREFIX,
+    tesseract_cmd=Config.TESSERACT_CMD
+)
+
+def _recognize(image):
+    """Preprocess and recognize one page in this process"""
+    image = ocr_preprocessor(image)
+    if image.mode not in ('1', 'L', 'RGB', 'RGBA'):
+        image = image.convert('RGB')
+    return ocr_engine.get().recognize(image)
+
+def _page_result(number, text, confidence):
+    page = {'page': number, 'text': text.strip(), 'success': True}
+    if confidence is not None:
+        page['confidence'] = confidence
+    return page
+
+def _needs_page_pool(image):
+    if Config.OCR_PAGE_WORKERS <= 1:
+        return False
+    return getattr(image, 'n_frames', 1) > 1 or image.width * image.height > Config.OCR_BAND_PIXELS
+
+def iter_ocr_pages(image):
+    """
+    OCR every page of an image, yielding results in page order as they finish
+
+    Multi-page TIFF/GIF files are recognized one page per worker process; a
+    single very large page is cut into bands between text lines and the
+    bands are recognized in parallel instead.
+
+    Yields:
+        {'page', 'text', 'confidence', 'success'} (or 'error') for each page
+    """
+    if not _needs_page_pool(image):
+        for number, page in enumerate(iter_pages(image, Config.OCR_MAX_PAGES), 1):
+            try:
+                yield _page_result(number, *_recognize(page))
+            except Exception as e:
+                yield {'page': number, 'error': str(e), 'success': False}
+        return
+
+    band_pixels = Config.OCR_BAND_PIXELS if getattr(image, 'n_frames', 1) == 1 else None
+    yield from ocr_page_pool.pages(iter_pages(image, Config.OCR_MAX_PAGES), ocr_preprocessor, band_pixels)
 
 def perform_ocr(image_file):
     try:
-        # Configure Tesseract path and data path
-        tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        tessdata_path = r'C:\Program Files\Tesseract-OCR\tessdata'
-        
-        # Set environment variables
-        os.environ['TESSDATA_PREFIX'] = tessdata_path
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        
         # Open and process the image
         image = Image.open(image_file)
         
+        if _needs_page_pool(image):
+            pages = list(iter_ocr_pages(image))
+            failed = [page for page in pages if not page['success']]
+            if failed:
+                return {'error': f"Page {failed[0]['page']}: {failed[0]['error']}", 'success': False}
+            result = {
+                'text': '\n\n'.join(page['text'] for page in pages).strip(),
+                'pages': len(pages),
+                'success': True
+            }
+            confidences = [page['confidence'] for page in pages if 'confidence' in page]
+            if confidences:
+                result['confidence'] = sum(confidences) / len(confidences)
+            return result
+        
         # Extract Bengali text
-        text = pytesseract.image_to_string(image, lang='ben+eng')
+        text, confidence = _recognize(image)
         
-        return {
+        result = {
             'text': text.strip(),
             'success': True
         }
+        if confidence is not None:
+            result['confidence'] = confidence
+        return result
         
     except Exception as e:
         return {
             'error': str(e),
             'success': False
         }
+
+def ocr_stream_response(image_file):
+    """
+    Stream OCR results page by page as NDJSON
+
+    Each finished page is sent as soon as every page before it is done, then
+    a final {'status': 'complete', 'pages': n} line.
+
+    Args:
+        image_file: Uploaded image (any format Pillow opens, including multi-page TIFF)
+
+    Returns:
+        Flask streaming response (application/x-ndjson)
+    """
+    image = Image.open(image_file)
+
+    def generate():
+        count = 0
+        try:
+            for page in iter_ocr_pages(image):
+                count += 1
+                yield json.dumps(page, ensure_ascii=False) + '\n'
+            yield json.dumps({'status': 'complete', 'pages': count}) + '\n'
+        except Exception as e:
+            yield json.dumps({'status': 'error', 'error': f"OCR failed: {str(e)}"}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -1,43 +1,312 @@
-from birdnetlib import Recording
-from birdnetlib.analyzer import Analyzer
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from flask import jsonify
+from flask import Response, jsonify, stream_with_context
+from werkzeug.utils import secure_filename
+from config.settings import Config
+from utils.blocking import run_blocking
+from utils.cache import LRUCache, ResultCache, hash_stream
+from utils.lazy import LazyModel
+import json
+import math
+import multiprocessing
 import os
+import shutil
+import soundfile as sf
+import tempfile
+import threading
+import time
+import zipfile
 
-# Initialize the analyzer once
-analyzer = Analyzer()
+AUDIO_EXTENSIONS = {'wav', 'mp3', 'flac', 'ogg'}
+
+def _load_analyzer():
+    # birdnetlib pulls in TensorFlow Lite and librosa; only pay for it when audio is analyzed
+    from birdnetlib.analyzer import Analyzer
+    return Analyzer()
+
+# Initialize the analyzer once, on first use
+birdnet_analyzer = LazyModel('birdnet', _load_analyzer)
+# The process-wide analyzer is shared by request threads (batch analysis, species lists)
+_analyzer_lock = threading.Lock()
+
+def get_analyzer():
+    return birdnet_analyzer.get()
+
+
+class PoolBusyError(Exception):
+    """Raised when every worker is busy and the pending queue is full"""
+
+
+def _init_worker():
+    """Runs once in each pool process so its Analyzer is loaded before it takes work"""
+    get_analyzer()
+
+
+def _ping():
+    return os.getpid()
+
+
+class AnalyzerPool:
+    """Process pool of pre-warmed BirdNET analyzers.
+
+    Each worker process owns its own Analyzer (and TFLite interpreter), so
+    recordings are analyzed in parallel instead of serializing on the single
+    module-level interpreter. At most ``workers + max_pending`` recordings are
+    accepted at a time; beyond that ``submit`` raises PoolBusyError.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or Config.BIRDNET_WORKERS
+        self.max_pending = Config.BIRDNET_MAX_PENDING if max_pending is None else max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn instead of fork: the parent already has TensorFlow loaded
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def start(self):
+        """Start every worker and wait until each one has loaded its model"""
+        executor = self._get_executor()
+        futures = [executor.submit(_ping) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)`` on a worker and return its Future"""
+        if not self._slots.acquire(blocking=False):
+            raise PoolBusyError('BirdNET analyzer queue is full')
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool and retry once
+            self._reset()
+            try:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+            except Exception:
+                self._slots.release()
+                raise
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._reset()
+
+
+analyzer_pool = AnalyzerPool()
+
+# Location species lists keyed by (lat cell, lon cell, week_48). Lists are
+# computed in the request process and handed to the pool workers, so every
+# worker shares the same cache.
+species_cache = LRUCache(maxsize=Config.BIRDNET_SPECIES_CACHE_SIZE)
+
+# Detections keyed by SHA-256 of the audio plus the analysis parameters
+bird_result_cache = ResultCache(
+    'birdnet',
+    Config.BIRDNET_MODEL_VERSION,
+    maxsize=Config.RESULT_CACHE_SIZE,
+    ttl=Config.RESULT_CACHE_TTL,
+    db_path=Config.RESULT_CACHE_DB
+)
+
+
+def week_48(date):
+    """BirdNET week of the year: four weeks per month, 1-48"""
+    return (date.month - 1) * 4 + min(4, (date.day - 1) // 7 + 1)
+
+def location_species(lat, lon, date):
+    """
+    Return the labels BirdNET expects at a location and time of year
+
+    Coordinates are snapped to a grid of BIRDNET_SPECIES_GRID degrees so
+    recorders at fixed sites always hit the same cache entry.
+
+    Args:
+        lat (float): Latitude of recording location
+        lon (float): Longitude of recording location
+        date (datetime): Date of recording
+
+    Returns:
+        frozenset: Allowed labels, or None when no location was given
+    """
+    if lat is None or lon is None:
+        return None
+
+    grid = Config.BIRDNET_SPECIES_GRID
+    lat_cell = math.floor(lat / grid)
+    lon_cell = math.floor(lon / grid)
+    week = week_48(date)
+
+    def compute():
+        with _analyzer_lock:
+            labels = run_blocking(
+                get_analyzer().return_predicted_species_list,
+                lon=(lon_cell + 0.5) * grid,
+                lat=(lat_cell + 0.5) * grid,
+                week_48=week
+            )
+        return frozenset(labels)
+
+    return species_cache.get_or_compute((lat_cell, lon_cell, week), compute)
+
+def _filter_species(detections, species):
+    if species is None:
+        return detections
+    return [detection for detection in detections if detection['label'] in species]
+
+def parse_recording_options(form):
+    """
+    Read latitude, longitude and date from a request form
+
+    The date is an ISO 8601 string (e.g. 2025-05-22) and defaults to now.
+
+    Returns:
+        dict: Keyword arguments for detect_birds/detect_birds_buffer
+
+    Raises:
+        ValueError: If a coordinate or the date cannot be parsed
+    """
+    latitude = form.get('latitude')
+    longitude = form.get('longitude')
+    date = form.get('date')
+
+    lat = float(latitude) if latitude else None
+    lon = float(longitude) if longitude else None
+    try:
+        date = datetime.fromisoformat(date) if date else datetime.now()
+    except ValueError:
+        raise ValueError(f"Invalid date '{date}', expected ISO format such as 2025-05-22")
+
+    return {
+        'date': date,
+        'min_conf': 0.25,
+        'species': location_species(lat, lon, date)
+    }
+
+
+def _result_cache_key(digest, form, options):
+    """Cache key for an upload: the date only matters through its BirdNET week"""
+    latitude = form.get('latitude')
+    longitude = form.get('longitude')
+    return bird_result_cache.make_key(
+        digest,
+        lat=float(latitude) if latitude else None,
+        lon=float(longitude) if longitude else None,
+        week=week_48(options['date']),
+        min_conf=options['min_conf']
+    )
+
+def detect_birds(audio_path, date=None, min_conf=0.25, species=None):
+    """
+    Run BirdNET on an audio file and return the raw birdnetlib detections
+
+    Args:
+        audio_path (str): Path to the audio file
+        date (datetime, optional): Date of recording
+        min_conf (float, optional): Minimum confidence threshold
+        species (frozenset, optional): Labels expected at the recording location (see location_species)
+
+    Returns:
+        list: birdnetlib detection dictionaries
+    """
+    from birdnetlib import Recording
+
+    recording = Recording(
+        get_analyzer(),
+        audio_path,
+        date=date or datetime.now(),
+        min_conf=min_conf
+    )
+    recording.analyze()
+    return _filter_species(recording.detections, species)
+
+def detect_birds_buffer(samples, rate, date=None, min_conf=0.25, species=None):
+    """
+    Run BirdNET on decoded audio samples and return the raw birdnetlib detections
+
+    Args:
+        samples (numpy.ndarray): Mono audio samples
+        rate (int): Sample rate of the samples
+        date (datetime, optional): Date of recording
+        min_conf (float, optional): Minimum confidence threshold
+        species (frozenset, optional): Labels expected at the recording location (see location_species)
+
+    Returns:
+        list: birdnetlib detection dictionaries
+    """
+    from birdnetlib import RecordingBuffer
+
+    recording = RecordingBuffer(
+        get_analyzer(),
+        samples,
+        rate,
+        date=date or datetime.now(),
+        min_conf=min_conf
+    )
+    recording.analyze()
+    return _filter_species(recording.detections, species)
+
+def decode_audio(stream):
+    """
+    Decode an audio stream into mono float32 samples without touching disk
+
+    Raises:
+        soundfile.SoundFileError: If libsndfile cannot decode the format
+    """
+    samples, rate = sf.read(stream, dtype='float32', always_2d=True)
+    return samples.mean(axis=1), rate
+
+def _spool_to_temp_file(audio_file, upload_folder):
+    """Copy an upload to a uniquely named file for formats that need ffmpeg"""
+    suffix = os.path.splitext(secure_filename(audio_file.filename))[1]
+    with tempfile.NamedTemporaryFile(dir=upload_folder, suffix=suffix, delete=False) as temp:
+        shutil.copyfileobj(audio_file.stream, temp)
+    return temp.name
 
 def analyze_bird_audio(audio_path, lat=None, lon=None, date=None, min_conf=0.25):
     """
     Analyze bird audio using BirdNET
-    
+
     Args:
         audio_path (str): Path to the audio file
         lat (float, optional): Latitude of recording location
         lon (float, optional): Longitude of recording location
         date (datetime, optional): Date of recording
         min_conf (float, optional): Minimum confidence threshold
-        
+
     Returns:
         list: List of detected birds with their details
     """
     try:
-        # Create recording object
-        recording = Recording(
-            analyzer,
+        date = date or datetime.now()
+        detections = detect_birds(
             audio_path,
-            lat=lat,
-            lon=lon,
-            date=date or datetime.now(),
-            min_conf=min_conf
+            date=date,
+            min_conf=min_conf,
+            species=location_species(lat, lon, date)
         )
-        
-        # Analyze the recording
-        recording.analyze()
-        
+
         # Format the results to match the expected output
         formatted_results = []
-        for detection in recording.detections:
+        for detection in detections:
             formatted_result = {
                 'species': detection['common_name'],
                 'confidence': detection['confidence'],
@@ -47,20 +316,20 @@ def analyze_bird_audio(audio_path, lat=None, lon=None, date=None, min_conf=0.25)
                 'label': detection['label']
             }
             formatted_results.append(formatted_result)
-        
+
         return formatted_results
-        
+
     except Exception as e:
         raise Exception(f"BirdNET analysis failed: {str(e)}")
 
 def analyze_bird(request, upload_folder):
     """
     Handle the bird analysis request
-    
+
     Args:
         request: Flask request object
         upload_folder: Path to the upload folder
-        
+
     Returns:
         Flask response with analysis results
     """
@@ -69,32 +338,167 @@ def analyze_bird(request, upload_folder):
             return jsonify({'error': 'No audio file provided'}), 400
 
         audio_file = request.files['audio']
-        latitude = request.form.get('latitude')
-        longitude = request.form.get('longitude')
-        
-        # Save the uploaded file temporarily
-        temp_path = os.path.join(upload_folder, audio_file.filename)
-        audio_file.save(temp_path)
-
-        # Create recording object with current date
-        recording = Recording(
-            analyzer,
-            temp_path,
-            lat=float(latitude) if latitude else None,
-            lon=float(longitude) if longitude else None,
-            date=datetime.now(),
-            min_conf=0.25
-        )
-        
-        # Analyze the recording
-        recording.analyze()
-        
-        # Clean up the temporary file
-        os.remove(temp_path)
+        try:
+            options = parse_recording_options(request.form)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Repeat uploads of the same clip skip BirdNET entirely
+        cache_key = _result_cache_key(hash_stream(audio_file.stream), request.form, options)
+        cached = bird_result_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
+
+        temp_path = None
+        try:
+            try:
+                # Decode straight from the upload stream and hand the samples to a free worker
+                samples, rate = decode_audio(audio_file.stream)
+                future = analyzer_pool.submit(detect_birds_buffer, samples, rate, **options)
+            except sf.SoundFileError:
+                # libsndfile can't decode this format; BirdNET needs a file path for ffmpeg
+                audio_file.stream.seek(0)
+                temp_path = _spool_to_temp_file(audio_file, upload_folder)
+                future = analyzer_pool.submit(detect_birds, temp_path, **options)
+            detections = future.result()
+        except PoolBusyError as e:
+            response = jsonify({'error': str(e)})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(Config.BIRDNET_RETRY_AFTER)
+            return response
+        finally:
+            # Clean up the temporary file, if one was needed
+            if temp_path:
+                os.remove(temp_path)
+
+        bird_result_cache.set(cache_key, detections)
 
         # Return the detections directly as they match the expected format
-        return jsonify(recording.detections)
+        return jsonify(detections)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+def _is_audio(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in AUDIO_EXTENSIONS
+
+def _stage_batch_files(files, batch_dir):
+    """
+    Write uploaded clips (and the audio members of any zip archives) into batch_dir
+
+    Returns:
+        dict: Staged file path -> original filename
+    """
+    staged = {}
+
+    def stage(name, source):
+        if len(staged) >= Config.BIRDNET_BATCH_MAX_FILES:
+            raise ValueError(f'Too many files in batch (max {Config.BIRDNET_BATCH_MAX_FILES})')
+        # secure_filename drops non-ASCII stems along with their dot, so the extension is re-attached
+        stem, ext = os.path.basename(name).rsplit('.', 1)
+        path = os.path.join(batch_dir, f"{len(staged):04d}_{secure_filename(stem)}.{ext.lower()}")
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(source, out)
+        staged[path] = name
+
+    for file in files:
+        if not file or file.filename == '':
+            continue
+        if file.filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(file.stream) as archive:
+                members = [m for m in archive.infolist() if not m.is_dir() and _is_audio(m.filename)]
+                if sum(m.file_size for m in members) > Config.BIRDNET_BATCH_MAX_BYTES:
+                    raise ValueError('Zip archive is too large once extracted')
+                for member in members:
+                    with archive.open(member) as source:
+                        stage(member.filename, source)
+        elif _is_audio(file.filename):
+            stage(file.filename, file.stream)
+
+    return staged
+
+def analyze_bird_batch(request, upload_folder):
+    """
+    Handle a batch of audio clips (files and/or zip archives) in one request
+
+    Clips are analyzed in parallel on the pre-warmed analyzer pool, at most
+    one per worker at a time, and the lat/lon species list is looked up once
+    in the shared location cache. Results are streamed back as NDJSON, one
+    line per file (detections or an error) as soon as that file is done,
+    followed by a final summary line. A full pool is answered with 503.
+
+    Args:
+        request: Flask request object
+        upload_folder: Path to the upload folder
+
+    Returns:
+        Flask streaming response (application/x-ndjson)
+    """
+    files = request.files.getlist('audio')
+    if not files or all(f.filename == '' for f in files):
+        return jsonify({'error': 'No audio files provided'}), 400
+
+    try:
+        options = parse_recording_options(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    batch_dir = tempfile.mkdtemp(prefix='batch_', dir=upload_folder)
+    try:
+        staged = _stage_batch_files(files, batch_dir)
+    except (ValueError, zipfile.BadZipFile) as e:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return jsonify({'error': str(e)}), 400
+
+    if not staged:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return jsonify({'error': 'No supported audio files found'}), 400
+
+    # Start the first clip before streaming, so a saturated pool is a 503 like /analyze-bird
+    waiting = deque(staged)
+    try:
+        pending = {analyzer_pool.submit(detect_birds, waiting[0], **options): waiting.popleft()}
+    except PoolBusyError as e:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        response = jsonify({'error': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(Config.BIRDNET_RETRY_AFTER)
+        return response
+
+    def generate():
+        processed = 0
+        delay = 0.05
+        try:
+            while waiting or pending:
+                # At most one clip per worker, so other requests still get slots while a batch runs
+                while waiting and len(pending) < analyzer_pool.workers:
+                    try:
+                        pending[analyzer_pool.submit(detect_birds, waiting[0], **options)] = waiting[0]
+                    except PoolBusyError:
+                        break
+                    waiting.popleft()
+                if not pending:
+                    # Other requests hold every slot; back off before trying again
+                    time.sleep(delay)
+                    delay = min(delay * 2, 1.0)
+                    continue
+                delay = 0.05
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = staged[pending.pop(future)]
+                    try:
+                        line = {'file': name, 'detections': future.result()}
+                        processed += 1
+                    except Exception as e:
+                        line = {'file': name, 'error': str(e)}
+                    yield json.dumps(line) + '\n'
+            yield json.dumps({'status': 'complete', 'files': len(staged), 'processed': processed}) + '\n'
+        finally:
+            # The client may have gone away mid-batch
+            for future in pending:
+                future.cancel()
+            shutil.rmtree(batch_dir, ignore_errors=True)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
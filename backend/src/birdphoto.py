@@ -1,22 +1,96 @@
 import os
-import requests
 from dotenv import load_dotenv
+from config.settings import Config
+from services.photo_batcher import PhotoBatcher
+from services.photo_classifier import (InvalidImageError, PhotoClassifierError, RemotePhotoClassifier,
+                                      create_photo_classifier, validate_image)
+from utils.cache import ResultCache, hash_bytes
+from utils.http_client import outbound_http
+from utils.lazy import LazyModel
 
 # Load environment variables
 load_dotenv()
 
 API_URL = "https://router.huggingface.co/hf-inference/models/chriamue/bird-species-classifier"
-headers = {
-    "Authorization": f"Bearer {os.getenv('HF_TOKEN')}",
-}
+
+# The hosted API is both a backend of its own and the fallback for the local ones
+remote_classifier = RemotePhotoClassifier(
+    API_URL,
+    os.getenv('HF_TOKEN'),
+    Config.BIRD_PHOTO_MODEL_VERSION,
+    outbound_http,
+    timeout=Config.BIRD_PHOTO_REMOTE_TIMEOUT
+)
+
+def _load_photo_classifier():
+    return create_photo_classifier(
+        Config.BIRD_PHOTO_BACKEND,
+        Config.BIRD_PHOTO_MODEL_PATH,
+        Config.BIRD_PHOTO_MODEL_DIR,
+        remote_classifier
+    )
+
+def _load_photo_batcher():
+    # Concurrent requests share forward passes; batching only helps the local backends
+    classifier = photo_classifier.get()
+    if classifier is remote_classifier or Config.BIRD_PHOTO_MAX_BATCH_SIZE <= 1:
+        return None
+    return PhotoBatcher(
+        classifier,
+        max_batch_size=Config.BIRD_PHOTO_MAX_BATCH_SIZE,
+        max_wait_ms=Config.BIRD_PHOTO_MAX_WAIT_MS
+    )
+
+# Load the classifier once, on first use
+photo_classifier = LazyModel('bird_photo', _load_photo_classifier)
+photo_batcher = LazyModel('bird_photo_batcher', _load_photo_batcher, register=False)
+
+# Classifier output keyed by SHA-256 of the image bytes (and the classifier version)
+photo_result_cache = ResultCache(
+    'bird_photo',
+    Config.BIRD_PHOTO_MODEL_VERSION,
+    maxsize=Config.RESULT_CACHE_SIZE,
+    ttl=Config.RESULT_CACHE_TTL,
+    db_path=Config.RESULT_CACHE_DB
+)
+
+def classify_photo(data):
+    """
+    Classify image bytes with the configured backend, falling back to the HuggingFace API
+
+    Only failures of the local model fall back; an undecodable image raises
+    InvalidImageError instead of costing a remote call.
+
+    Returns:
+        Tuple of (list of {'label', 'score'} dictionaries, version of the classifier that produced them)
+    """
+    classifier = photo_classifier.get()
+    try:
+        batcher = photo_batcher.get()
+        if batcher is not None:
+            return batcher.classify(data), classifier.version
+        return classifier.classify(data), classifier.version
+    except (PhotoClassifierError, InvalidImageError):
+        raise
+    except Exception as e:
+        if classifier is remote_classifier:
+            raise
+        print(f"Local photo classifier failed ({e}); falling back to the HuggingFace API")
+        return remote_classifier.classify(data), remote_classifier.version
+
+def photo_batcher_stats():
+    """Batch statistics, or None until a local classifier has been loaded"""
+    if not photo_batcher.loaded or photo_batcher.get() is None:
+        return None
+    return photo_batcher.get().stats()
 
 def analyze_bird_photo(request, upload_folder):
     """
-    Analyze a bird photo using HuggingFace's bird species classifier model.
+    Analyze a bird photo with the bird species classifier model.
     
     Args:
         request: Flask request object containing the image file
-        upload_folder: Directory to temporarily store uploaded files
+        upload_folder: Unused, kept for the route signature (photos are read in memory)
     
     Returns:
         List of dictionaries containing bird species detection results
@@ -29,27 +103,27 @@ def analyze_bird_photo(request, upload_folder):
         if file.filename == '':
             return {'error': 'No selected file'}, 400
         
-        # Save the uploaded file temporarily
-        filepath = os.path.join(upload_folder, file.filename)
-        file.save(filepath)
-        
-        # Query the HuggingFace API
-        with open(filepath, "rb") as f:
-            data = f.read()
-        
-        response = requests.post(
-            API_URL,
-            headers={"Content-Type": "image/jpeg", **headers},
-            data=data
-        )
+        data = file.read()
         
-        # Clean up the temporary file
-        os.remove(filepath)
+        # Repeat uploads of the same photo skip the classifier
+        version = photo_classifier.get().version
+        cache_key = photo_result_cache.make_key(hash_bytes(data), model=version)
+        cached = photo_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        if response.status_code != 200:
-            return {'error': f'Failed to analyze image: {response.text}'}, 500
+        # Reject non-images before they reach a batch or the remote API
+        try:
+            validate_image(data)
+        except InvalidImageError as e:
+            return {'error': str(e)}, 400
         
-        results = response.json()
+        try:
+            results, produced_by = classify_photo(data)
+        except InvalidImageError as e:
+            return {'error': str(e)}, 400
+        except PhotoClassifierError as e:
+            return {'error': str(e)}, 500
         
         # Format the response to match the expected model
         formatted_results = []
@@ -62,6 +136,9 @@ def analyze_bird_photo(request, upload_folder):
                 'end_time': 0.0
             })
         
+        # Fallback results came from another model; don't serve them once the local one recovers
+        if produced_by == version:
+            photo_result_cache.set(cache_key, formatted_results)
         return formatted_results
         
     except Exception as e:
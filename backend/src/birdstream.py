@@ -0,0 +1,204 @@
+from birdnet import PoolBusyError, analyzer_pool, detect_birds_buffer, parse_recording_options
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from flask import Response, jsonify, stream_with_context
+from werkzeug.wsgi import get_input_stream
+from config.settings import Config
+import json
+import numpy as np
+import struct
+import time
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavStreamReader:
+    """
+    Incremental WAV reader for uploads of unknown length
+
+    Only the header is parsed up front; samples are then read one segment at a
+    time, so memory use does not depend on the length of the recording. The
+    RIFF/data sizes are ignored because streaming recorders often leave them
+    as 0 or 0xFFFFFFFF.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.rate = None
+        self.channels = None
+        self.sample_width = None
+        self.is_float = False
+        self._read_header()
+
+    def _read_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.stream.read(size - len(data))
+            if not chunk:
+                break
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_header(self):
+        header = self._read_exact(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError('Stream is not a RIFF/WAVE file')
+
+        while True:
+            chunk_header = self._read_exact(8)
+            if len(chunk_header) < 8:
+                raise ValueError('WAV stream ended before the data chunk')
+            chunk_id, chunk_size = chunk_header[:4], struct.unpack('<I', chunk_header[4:])[0]
+
+            if chunk_id == b'data':
+                break
+
+            body = self._read_exact(chunk_size + (chunk_size & 1))  # chunks are word aligned
+            if chunk_id == b'fmt ':
+                audio_format, self.channels, self.rate = struct.unpack('<HHI', body[:8])
+                bits = struct.unpack('<H', body[14:16])[0]
+                if audio_format == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    audio_format = struct.unpack('<H', body[24:26])[0]
+                if audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+                    raise ValueError(f'Unsupported WAV encoding {audio_format:#06x}')
+                self.is_float = audio_format == WAVE_FORMAT_IEEE_FLOAT
+                self.sample_width = bits // 8
+
+        if self.rate is None:
+            raise ValueError('WAV stream has no fmt chunk')
+
+    def _to_float(self, data):
+        """Convert interleaved little-endian frames to mono float32"""
+        width = self.sample_width
+        if self.is_float:
+            samples = np.frombuffer(data, dtype='<f4' if width == 4 else '<f8').astype(np.float32)
+        elif width == 1:
+            samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif width == 2:
+            samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+        elif width == 3:
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+            padded = np.zeros((raw.shape[0], 4), dtype=np.uint8)
+            padded[:, 1:] = raw  # shift into the top three bytes to keep the sign
+            samples = padded.view('<i4').ravel().astype(np.float32) / 2147483648.0
+        elif width == 4:
+            samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 2147483648.0
+        else:
+            raise ValueError(f'Unsupported WAV sample width {width * 8} bits')
+        return samples.reshape(-1, self.channels).mean(axis=1)
+
+    def segments(self, seconds):
+        """Yield (offset_seconds, mono float32 samples) for consecutive segments"""
+        frame_size = self.sample_width * self.channels
+        frames_per_segment = int(self.rate * seconds)
+        offset = 0.0
+        while True:
+            data = self._read_exact(frames_per_segment * frame_size)
+            data = data[:len(data) - len(data) % frame_size]
+            if not data:
+                return
+            samples = self._to_float(data)
+            yield offset, samples
+            offset += len(samples) / self.rate
+            if len(samples) < frames_per_segment:
+                return
+
+
+def _submit_segment(samples, rate, options, in_flight):
+    """Queue a segment on the analyzer pool, backing off while the pool is full"""
+    delay = 0.05
+    while True:
+        try:
+            return analyzer_pool.submit(detect_birds_buffer, samples, rate, **options)
+        except PoolBusyError:
+            # Other requests may hold every slot, so never retry without waiting
+            pending = [future for _, future in in_flight if not future.done()]
+            if pending:
+                wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+
+def analyze_bird_stream(request, socketio=None):
+    """
+    Analyze a WAV upload of any length while it is still arriving
+
+    The body is read incrementally (chunked transfer encoding is fine and
+    MAX_CONTENT_LENGTH does not apply), cut into BIRDNET_STREAM_SEGMENT_SECONDS
+    windows and fed to the analyzer pool. Detections come back in order as
+    NDJSON lines with start/end times relative to the whole recording; when an
+    X-Socket-ID header is present each one is also emitted as a
+    'bird_detection' Socket.IO event to that room.
+
+    Location and date are read from the query string (latitude, longitude, date).
+
+    Args:
+        request: Flask request object
+        socketio: SocketIO instance used for 'bird_detection' events
+
+    Returns:
+        Flask streaming response (application/x-ndjson)
+    """
+    try:
+        options = parse_recording_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    socket_id = request.headers.get('X-Socket-ID')
+    # Bypass MAX_CONTENT_LENGTH: this endpoint never buffers the whole body
+    stream = get_input_stream(request.environ, max_content_length=None)
+
+    try:
+        reader = WavStreamReader(stream)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def emit(event, data):
+        if socketio and socket_id:
+            socketio.emit(event, data, room=socket_id)
+
+    def finished(offset, future):
+        detections = []
+        for detection in future.result():
+            detection = dict(detection)
+            detection['start_time'] += offset
+            detection['end_time'] += offset
+            detections.append(detection)
+            emit('bird_detection', detection)
+        return detections
+
+    def generate():
+        in_flight = deque()
+        total = 0
+        duration = 0.0
+        try:
+            for offset, samples in reader.segments(Config.BIRDNET_STREAM_SEGMENT_SECONDS):
+                in_flight.append((offset, _submit_segment(samples, reader.rate, options, in_flight)))
+                duration = offset + len(samples) / reader.rate
+
+                # Send back every segment that is already done, keeping time order
+                while in_flight and (in_flight[0][1].done() or len(in_flight) > analyzer_pool.workers):
+                    for detection in finished(*in_flight.popleft()):
+                        total += 1
+                        yield json.dumps(detection) + '\n'
+
+            while in_flight:
+                for detection in finished(*in_flight.popleft()):
+                    total += 1
+                    yield json.dumps(detection) + '\n'
+
+            summary = {'status': 'complete', 'duration': duration, 'detections': total}
+            emit('bird_detection_complete', summary)
+            yield json.dumps(summary) + '\n'
+
+        except Exception as e:
+            for _, future in in_flight:
+                future.cancel()
+            error = {'status': 'error', 'error': f"BirdNET stream analysis failed: {str(e)}"}
+            emit('bird_detection_complete', error)
+            yield json.dumps(error) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -5,5 +5,117 @@ class Config:
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB limit for uploads
 
+    # BirdNET analyzer pool
+    BIRDNET_WORKERS = int(os.getenv('BIRDNET_WORKERS', os.cpu_count() or 1))
+    BIRDNET_MAX_PENDING = int(os.getenv('BIRDNET_MAX_PENDING', 8))  # queued recordings beyond busy workers
+    BIRDNET_RETRY_AFTER = int(os.getenv('BIRDNET_RETRY_AFTER', 5))  # seconds, sent with 503 when the queue is full
+    BIRDNET_BATCH_MAX_FILES = int(os.getenv('BIRDNET_BATCH_MAX_FILES', 200))
+    BIRDNET_BATCH_MAX_BYTES = int(os.getenv('BIRDNET_BATCH_MAX_BYTES', 512 * 1024 * 1024))  # extracted zip contents
+    BIRDNET_SPECIES_CACHE_SIZE = int(os.getenv('BIRDNET_SPECIES_CACHE_SIZE', 256))
+    BIRDNET_SPECIES_GRID = float(os.getenv('BIRDNET_SPECIES_GRID', 0.1))  # degrees per cache cell
+    BIRDNET_STREAM_SEGMENT_SECONDS = float(os.getenv('BIRDNET_STREAM_SEGMENT_SECONDS', 3.0))  # BirdNET window length
+    BIRDNET_MODEL_VERSION = os.getenv('BIRDNET_MODEL_VERSION', 'birdnet-2.4')
+
+    # Analysis result cache (bird audio and photos); the SQLite tier is off unless RESULT_CACHE_DB is set
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 1024))
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    RESULT_CACHE_DB = os.getenv('RESULT_CACHE_DB')
+    BIRD_PHOTO_MODEL_VERSION = os.getenv('BIRD_PHOTO_MODEL_VERSION', 'chriamue/bird-species-classifier')
+
+    # Bird photo classifier: 'onnx' or 'tflite' run in-process, 'remote' calls the HuggingFace API
+    BIRD_PHOTO_BACKEND = os.getenv('BIRD_PHOTO_BACKEND', 'onnx')
+    BIRD_PHOTO_MODEL_DIR = os.getenv(
+        'BIRD_PHOTO_MODEL_DIR',
+        os.path.join('uploads', 'models', 'models--chriamue--bird-species-classifier',
+                     'snapshots', '558944ca4448f5b311af8393c8b894eff20a06da')
+    )
+    BIRD_PHOTO_MODEL_PATH = os.getenv('BIRD_PHOTO_MODEL_PATH', os.path.join(BIRD_PHOTO_MODEL_DIR, 'model.onnx'))
+    BIRD_PHOTO_REMOTE_TIMEOUT = float(os.getenv('BIRD_PHOTO_REMOTE_TIMEOUT', 30))  # seconds
+    BIRD_PHOTO_MAX_BATCH_SIZE = int(os.getenv('BIRD_PHOTO_MAX_BATCH_SIZE', 16))  # 1 disables micro-batching
+    BIRD_PHOTO_MAX_WAIT_MS = float(os.getenv('BIRD_PHOTO_MAX_WAIT_MS', 10))  # how long a batch waits to fill up
+
+    # Outbound HTTP (HuggingFace, Tavily)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))  # seconds
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))  # seconds
+    HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 100))
+    HTTP_PER_HOST_LIMIT = int(os.getenv('HTTP_PER_HOST_LIMIT', 20))  # concurrent requests per upstream host
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+    HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', 0.25))  # seconds, doubled per retry with full jitter
+    HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', 4))
+    HTTP_BREAKER_THRESHOLD = int(os.getenv('HTTP_BREAKER_THRESHOLD', 5))  # consecutive failures before failing fast
+    HTTP_BREAKER_RESET = float(os.getenv('HTTP_BREAKER_RESET', 30))  # seconds before a trial request
+
+    # Semantic fact-check cache
+    FACTCHECK_CACHE_THRESHOLD = float(os.getenv('FACTCHECK_CACHE_THRESHOLD', 0.92))  # cosine similarity for a hit
+    FACTCHECK_CACHE_TTL = int(os.getenv('FACTCHECK_CACHE_TTL', 6 * 3600))  # seconds a verdict stays fresh
+    FACTCHECK_CACHE_SIZE = int(os.getenv('FACTCHECK_CACHE_SIZE', 5000))
+    FACTCHECK_CACHE_MAX_CHARS = int(os.getenv('FACTCHECK_CACHE_MAX_CHARS', 1000))  # longer queries are not cached
+
+    # Tesseract OCR; unset paths fall back to the system install
+    OCR_LANG = os.getenv('OCR_LANG', 'ben+eng')
+    OCR_WORKERS = int(os.getenv('OCR_WORKERS', os.cpu_count() or 1))  # persistent engines, one per concurrent OCR
+    OCR_TIMEOUT = float(os.getenv('OCR_TIMEOUT', 60))  # seconds to wait for a free engine
+    TESSDATA_PREFIX = os.getenv('TESSDATA_PREFIX')  # directory holding ben.traineddata/eng.traineddata
+    TESSERACT_CMD = os.getenv('TESSERACT_CMD')  # tesseract binary, only used by the pytesseract fallback
+    # Comma-separated cleanup steps run before OCR (exif, grayscale, downscale, binarize, deskew, crop); empty disables
+    OCR_PREPROCESS_STEPS = [step.strip() for step in os.getenv(
+        'OCR_PREPROCESS_STEPS', 'exif,grayscale,downscale,binarize,deskew,crop'
+    ).split(',') if step.strip()]
+    OCR_TARGET_DPI = int(os.getenv('OCR_TARGET_DPI', 300))  # scans tagged with a higher DPI are scaled down to this
+    OCR_MAX_PIXELS = int(os.getenv('OCR_MAX_PIXELS', 8_000_000))  # cap for photos without a DPI tag
+    OCR_PAGE_WORKERS = int(os.getenv('OCR_PAGE_WORKERS', os.cpu_count() or 1))  # processes for multi-page/large images
+    OCR_BAND_PIXELS = int(os.getenv('OCR_BAND_PIXELS', 4_000_000))  # larger single pages are split into bands
+    OCR_MAX_PAGES = int(os.getenv('OCR_MAX_PAGES', 100))  # frames accepted from one TIFF/GIF
+
+    # PDF text extraction
+    PDF_WORKERS = int(os.getenv('PDF_WORKERS', os.cpu_count() or 1))  # processes extracting page ranges
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 8))  # pages one worker extracts per task
+    PDF_MIN_TEXT_CHARS = int(os.getenv('PDF_MIN_TEXT_CHARS', 20))  # pages with less text are OCR'd
+    PDF_OCR_DPI = int(os.getenv('PDF_OCR_DPI', 300))  # render resolution for OCR'd pages
+
+    # Chunking of extracted PDF/OCR text for fact checking and question generation
+    CHUNK_TOKENS = int(os.getenv('CHUNK_TOKENS', 800))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', 100))
+    CHUNK_TOKENIZER = os.getenv('CHUNK_TOKENIZER', '')  # tiktoken encoding (e.g. cl100k_base); empty estimates
+
+    # MCQ generation
+    QUESTION_GEN_PROVIDER = os.getenv('QUESTION_GEN_PROVIDER', 'google')  # 'google' (Gemini) or 'openai'
+    QUESTION_GEN_MODEL = os.getenv('QUESTION_GEN_MODEL')  # provider default when unset
+    QUESTION_GEN_CONCURRENCY = int(os.getenv('QUESTION_GEN_CONCURRENCY', 8))  # chunks summarized/questioned at once
+    QUESTION_GEN_SUMMARY_BATCH_TOKENS = int(os.getenv('QUESTION_GEN_SUMMARY_BATCH_TOKENS', 2000))  # pack short chunks into one summarization request up to this size (0 disables)
+    QUESTION_GEN_SUMMARY_BATCH_SIZE = int(os.getenv('QUESTION_GEN_SUMMARY_BATCH_SIZE', 8))  # most chunks per summarization request
+    # Chunk summaries and question sets are kept on disk so regenerating for an unchanged PDF reuses them; empty disables the file
+    QUESTION_CACHE_DB = os.getenv('QUESTION_CACHE_DB', 'question_cache.sqlite3')
+    QUESTION_CACHE_SIZE = int(os.getenv('QUESTION_CACHE_SIZE', 20000))  # rows per namespace before LRU eviction
+    QUESTION_CACHE_TTL = int(os.getenv('QUESTION_CACHE_TTL', 30 * 24 * 3600))  # seconds
+    QUESTION_DEDUP = os.getenv('QUESTION_DEDUP', 'true').lower() in ('1', 'true', 'yes')  # drop repeated questions from the final list
+    QUESTION_DEDUP_THRESHOLD = float(os.getenv('QUESTION_DEDUP_THRESHOLD', 0.9))  # cosine similarity of MiniLM embeddings
+    QUESTION_DEDUP_BLOCK_SIZE = int(os.getenv('QUESTION_DEDUP_BLOCK_SIZE', 1024))  # questions compared per matrix product
+
+    # Background jobs (fact checks, question generation) in a SQLite queue shared by every server process
+    JOB_DB = os.getenv('JOB_DB', 'jobs.sqlite3')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))  # jobs run at once per process; 0 leaves them to job_worker.py
+    JOB_RETENTION = int(os.getenv('JOB_RETENTION', 24 * 3600))  # seconds finished jobs and their results are kept
+    JOB_LEASE = float(os.getenv('JOB_LEASE', 60))  # seconds before a job of a dead process is run again
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_UPLOAD_FOLDER = os.getenv('JOB_UPLOAD_FOLDER', os.path.join('uploads', 'jobs'))  # files waiting for their job
+
+    # Server: app.py runs the development server, serve.py the production one on gevent
+    SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+    SERVER_PORT = int(os.getenv('SERVER_PORT', 5000))
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')  # serve.py defaults it to 'gevent'
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    SOCKETIO_LOG_LEVEL = os.getenv('SOCKETIO_LOG_LEVEL', 'WARNING')  # INFO logs every Socket.IO/Engine.IO packet
+    ACCESS_LOG = os.getenv('ACCESS_LOG', 'false').lower() in ('1', 'true', 'yes')  # one line per HTTP request under gevent
+    BLOCKING_THREADS = int(os.getenv('BLOCKING_THREADS', os.cpu_count() or 1))  # real threads for OCR/ONNX calls under gevent
+
+    # Socket.IO scale-out: with a message queue (e.g. redis://localhost:6379/0) an emit from any server or
+    # job worker process reaches clients connected to every other process
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+
+    # Startup
+    PRELOAD_MODELS = os.getenv('PRELOAD_MODELS', 'false').lower() in ('1', 'true', 'yes')  # load every model before serving
+
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
\ No newline at end of file
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
@@ -0,0 +1,213 @@
+from config.settings import Config
+from services.embeddings import sentence_embeddings
+from services.semantic_cache import SemanticCache
+from utils.blocking import run_blocking
+from utils.http_client import outbound_http
+import asyncio
+import time
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+class FactCheckChain:
+    def __init__(self, tavily_api_key, google_api_key, http=outbound_http, embeddings=sentence_embeddings):
+        self.tavily_api_key = tavily_api_key
+        self.http = http
+        # Imported here so the server can start without loading langchain/torch
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        
+        self.model = ChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key=google_api_key)
+        self.embeddings = embeddings
+        self.cache = SemanticCache(
+            threshold=Config.FACTCHECK_CACHE_THRESHOLD,
+            ttl=Config.FACTCHECK_CACHE_TTL,
+            max_entries=Config.FACTCHECK_CACHE_SIZE
+        )
+    
+    async def _embed_query(self, query):
+        """Normalized embedding of a query, or None if it can't be cached"""
+        # MiniLM only reads the first ~256 tokens; longer texts (file uploads) would collide
+        if len(query) > Config.FACTCHECK_CACHE_MAX_CHARS:
+            return None
+        try:
+            # Under gevent to_thread's workers are greenlets, so the model runs in a real thread
+            vector = await asyncio.to_thread(run_blocking, self.embeddings.get().embed_query, query)
+            return SemanticCache.normalize(vector)
+        except Exception as e:
+            print(f"Could not embed query for the semantic cache: {e}")
+            return None
+    
+    async def search(self, query, search_depth="advanced", max_results=5):
+        """Query the Tavily search API over the shared pooled HTTP client"""
+        response = await self.http.apost(
+            TAVILY_SEARCH_URL,
+            headers={"Authorization": f"Bearer {self.tavily_api_key}"},
+            json={
+                "query": query,
+                "search_depth": search_depth,
+                "max_results": max_results
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def verify_facts(self, socketio, queries, socket_ids=None):
+        """Fact check several queries concurrently on the current event loop"""
+        socket_ids = socket_ids or [None] * len(queries)
+        return await asyncio.gather(
+            *(self.verify_fact(socketio, query, socket_id) for query, socket_id in zip(queries, socket_ids)),
+            return_exceptions=True
+        )
+    
+    async def verify_fact(self, socketio, query, socket_id=None):
+        try:
+            print(f"Starting fact check for query: {query}")
+            print(f"Socket ID: {socket_id}")
+            
+            # Reuse the verdict of a recent near-duplicate query
+            query_vector = await self._embed_query(query)
+            cached = self.cache.lookup(query_vector) if query_vector is not None else None
+            if cached:
+                cached_query, cached_result, similarity = cached
+                print(f"Semantic cache hit ({similarity:.3f}) for: {cached_query}")
+                if socket_id:
+                    socketio.emit('fact_check_update', {
+                        'type': 'search_complete',
+                        'message': f"Found {len(cached_result['sources'])} relevant sources",
+                        'status': 'analyzing',
+                        'sources': cached_result['sources'],
+                        'cached': True
+                    }, room=socket_id)
+                    socketio.emit('fact_check_update', {
+                        'type': 'analysis_complete',
+                        'message': 'Fact-check analysis complete',
+                        'status': 'complete',
+                        'cached': True
+                    }, room=socket_id)
+                return {
+                    **cached_result,
+                    'query': query,
+                    'cached': True,
+                    'cached_query': cached_query,
+                    'similarity': similarity
+                }
+            
+            # Emit search start
+            if socket_id:
+                socketio.emit('fact_check_update', {
+                    'type': 'search_start',
+                    'message': 'Starting search for relevant sources...',
+                    'status': 'searching'
+                }, room=socket_id)
+                print("Emitted search_start event")
+            
+            # Search for sources
+            print("Searching with Tavily...")
+            search_results = await self.search(
+                query=query,
+                search_depth="advanced",
+                max_results=5
+            )
+            print(f"Search results: {len(search_results.get('results', []))} sources found")
+            
+            # Process sources for better formatting
+            sources = []
+            for result in search_results.get('results', []):
+                sources.append({
+                    'title': result.get('title', 'Unknown Source'),
+                    'url': result.get('url', ''),
+                    'content': result.get('content', ''),
+                    'score': result.get('score', 0.5),
+                    'raw_content': result.get('raw_content', None)
+                })
+            
+            # Emit search completion
+            if socket_id:
+                socketio.emit('fact_check_update', {
+                    'type': 'search_complete',
+                    'message': f'Found {len(sources)} relevant sources',
+                    'status': 'analyzing',
+                    'sources': sources
+                }, room=socket_id)
+                print("Emitted search_complete event")
+            
+            # Analyze results
+            if socket_id:
+                socketio.emit('fact_check_update', {
+                    'type': 'analysis_start',
+                    'message': 'Analyzing sources and generating fact-check report...',
+                    'status': 'generating'
+                }, room=socket_id)
+                print("Emitted analysis_start event")
+            
+            # Create context for the AI model
+            context = f"""
+            Query to fact-check: {query}
+            
+            Sources found:
+            """
+            
+            for i, source in enumerate(sources, 1):
+                context += f"""
+            Source {i}:
+            Title: {source['title']}
+            URL: {source['url']}
+            Content: {source['content'][:500]}...
+            Relevance Score: {source['score']:.2f}
+            
+            """
+            
+            prompt = f"""
+            As a fact-checking expert, analyze the following query and sources to provide a comprehensive fact-check report.
+            
+            {context}
+            
+            Please provide:
+            1. A clear summary of what the query is asking
+            2. Detailed analysis based on the sources
+            3. Fact-checking verdict with evidence
+            4. Any important caveats or limitations
+            
+            Format your response in clear, readable markdown with proper headings and structure.
+            """
+            
+            # Generate final response
+            print("Generating AI response...")
+            response = await self.model.ainvoke(prompt)
+            print("AI response generated")
+            
+            # Emit completion
+            if socket_id:
+                socketio.emit('fact_check_update', {
+                    'type': 'analysis_complete',
+                    'message': 'Fact-check analysis complete',
+                    'status': 'complete'
+                }, room=socket_id)
+                print("Emitted analysis_complete event")
+            
+            result = {
+                'verified': True,
+                'analysis': response.content,
+                'sources': sources,
+                'query': query,
+                'timestamp': time.time(),
+                'cached': False
+            }
+            
+            if query_vector is not None:
+                self.cache.add(query_vector, query, dict(result))
+            
+            print("Fact check completed successfully")
+            return result
+            
+        except Exception as e:
+            print(f"Error during fact-checking: {e}")
+            
+            # Emit error
+            if socket_id:
+                socketio.emit('fact_check_update', {
+                    'type': 'error',
+                    'message': f'Error during fact-checking: {str(e)}',
+                    'status': 'error'
+                }, room=socket_id)
+            
+            raise e
\ No newline at end of file
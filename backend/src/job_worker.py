@@ -0,0 +1,35 @@
+"""
+Standalone background job worker
+
+Runs the fact checks and question generation queued in JOB_DB without
+serving HTTP, so server processes can run with JOB_WORKERS=0 and jobs scale
+on their own. Progress events reach the client's room through
+SOCKETIO_MESSAGE_QUEUE, whichever server process the client is connected to.
+
+    SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0 python src/job_worker.py --workers 8
+"""
+import argparse
+import time
+from config.settings import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=max(1, Config.JOB_WORKERS), help='jobs run at once')
+    args = parser.parse_args()
+
+    # The job handlers live next to the endpoints that queue them
+    from app import job_queue
+
+    if not Config.SOCKETIO_MESSAGE_QUEUE:
+        print("WARNING: SOCKETIO_MESSAGE_QUEUE is not set, so job progress can't reach Socket.IO clients "
+              "(polling /api/jobs/<id> still works)")
+    job_queue.workers = args.workers
+    job_queue.start()
+    print(f"Job worker {job_queue.owner} running up to {args.workers} jobs from {Config.JOB_DB}")
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == '__main__':
+    main()
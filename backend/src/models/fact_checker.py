@@ -1,5 +1,5 @@
 from flask import jsonify
-from services.pdf_chunker import PDFProcessor
+from services.pdf_processor import PDFProcessor
 from services.image_processor import ImageProcessor
 
 class FactChecker:
@@ -11,7 +11,7 @@ class FactChecker:
         results = {}
         for file in files:
             if file.filename.endswith('.pdf'):
-                results[file.filename] = self.pdf_processor.process(file)
+                results[file.filename], _ = self.pdf_processor.process_upload(file)
             elif file.filename.lower().endswith(('.png', '.jpg', '.jpeg')):
                 results[file.filename] = self.image_processor.process(file)
             else:
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from services.file_processor import FileProcessor
-from services.pdf_chunker import PDFProcessor
+from services.pdf_processor import PDFProcessor
 from services.image_processor import ImageProcessor
 
 fact_check_bp = Blueprint('fact_check', __name__)
+pdf_processor = PDFProcessor()
 
 @fact_check_bp.route('/fact-check', methods=['POST'])
 def fact_check():
@@ -12,9 +13,11 @@ def fact_check():
 
     for file in uploaded_files:
         if file.filename.endswith('.pdf'):
-            pdf_processor = PDFProcessor(file)
-            chunks = pdf_processor.chunk()
-            results.append({'file': file.filename, 'chunks': chunks})
+            chunks, _ = pdf_processor.process_upload(file)
+            results.append({
+                'file': file.filename,
+                'chunks': [{'content': chunk.page_content, 'metadata': chunk.metadata} for chunk in chunks]
+            })
         elif file.filename.lower().endswith(('.png', '.jpg', '.jpeg')):
             image_processor = ImageProcessor(file)
             analysis_result = image_processor.process()
@@ -2,9 +2,10 @@ from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
 import os
 from services.file_processor import FileProcessor
-from services.pdf_chunker import PDFProcessor
+from services.pdf_processor import PDFProcessor
 
 upload_bp = Blueprint('upload', __name__)
+pdf_processor = PDFProcessor()
 
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif'}
@@ -30,8 +31,7 @@ def upload_files():
             uploaded_files.append(file_path)
 
             if filename.endswith('.pdf'):
-                pdf_processor = PDFProcessor(file_path)
-                pdf_chunks = pdf_processor.chunk_pdf()
+                pdf_chunks, _ = pdf_processor.process_pdf(file_path)
                 # Process PDF chunks as needed
 
     return jsonify({'uploaded_files': uploaded_files}), 200
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Production entry point: the same app on gevent's WSGI server
+
+Every HTTP request and Socket.IO connection is a greenlet instead of an OS
+thread, so one process holds thousands of long-poll and WebSocket clients.
+Native OCR/ONNX calls run in a small pool of real threads (BLOCKING_THREADS)
+and heavy work already runs in the process pools, so neither stalls the
+event loop. There is no Werkzeug reloader or debugger, and log levels come
+from LOG_LEVEL / SOCKETIO_LOG_LEVEL.
+
+    python src/serve.py
+    python src/serve.py --port 8000 --preload
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import os
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'gevent')
+
+import argparse
+import gevent
+import logging
+import threading
+from config.settings import Config
+from app import app, job_queue, socketio, warm_up, warmup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=Config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=Config.SERVER_PORT)
+    parser.add_argument('--preload', action='store_true', default=Config.PRELOAD_MODELS,
+                        help='Load every model in the background at startup instead of on first use')
+    args = parser.parse_args()
+
+    gevent.get_hub().threadpool.maxsize = Config.BLOCKING_THREADS
+    # geventwebsocket's handler writes its own access line per request, whatever log_output says
+    logging.getLogger('geventwebsocket.handler').setLevel(logging.INFO if Config.ACCESS_LOG else logging.WARNING)
+    if args.preload:
+        warmup['enabled'] = True
+        threading.Thread(target=warm_up, name='model-warmup', daemon=True).start()
+    job_queue.start()
+
+    print(f"Serving BigGan Mela on {args.host}:{args.port} ({socketio.async_mode})")
+    socketio.run(app, host=args.host, port=args.port, log_output=Config.ACCESS_LOG)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+from utils.lazy import LazyModel
+
+
+def _load_embeddings():
+    # Imported here so the server can start without loading langchain/torch
+    from langchain.embeddings import SentenceTransformerEmbeddings
+    return SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
+
+# One MiniLM instance shared by the fact-check semantic cache and question deduplication
+sentence_embeddings = LazyModel('sentence_embeddings', _load_embeddings)
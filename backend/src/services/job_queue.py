@@ -0,0 +1,370 @@
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler once the job has been cancelled"""
+
+
+class JobContext:
+    """What a job handler gets: its payload plus progress, cancellation and Socket.IO helpers"""
+
+    def __init__(self, queue, job_id, kind, payload, socket_id):
+        self.queue = queue
+        self.id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.socket_id = socket_id
+
+    @property
+    def cancelled(self):
+        return self.queue._cancel_requested(self.id)
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.id)
+
+    def progress(self, **progress):
+        """Record progress (pollable via get()) and push it to the job's room; raises JobCancelled if cancelled"""
+        self.queue._set_progress(self.id, progress)
+        self.emit('job_update', {'job_id': self.id, 'kind': self.kind, 'status': 'running', 'progress': progress})
+        self.check_cancelled()
+
+    def emit(self, event, data):
+        if self.socket_id and self.queue.emit is not None:
+            self.queue.emit(event, data, room=self.socket_id)
+
+    def wait(self, future, poll=0.5):
+        """Wait for a concurrent future, cancelling it if the job is cancelled meanwhile"""
+        while True:
+            try:
+                return future.result(timeout=poll)
+            except FutureTimeout:
+                if self.cancelled:
+                    future.cancel()
+                    raise JobCancelled(self.id)
+
+
+class JobQueue:
+    """
+    Durable background job queue on a local SQLite file
+
+    submit() stores a job and returns its id straight away; worker threads
+    claim queued jobs highest priority first (oldest first within a
+    priority) and run the handler registered for the job's kind. Status,
+    progress and results live in the database, so they can be polled from
+    any process sharing the file and survive restarts.
+
+    A claimed job holds a lease that its worker renews while the handler
+    runs. Jobs whose lease ran out (the process died) go back to the queue,
+    up to max_attempts runs. Finished jobs are deleted after retention
+    seconds.
+
+    With workers=0 the process only submits, polls and cancels jobs, and
+    a separate worker process (job_worker.py) runs them.
+    """
+
+    def __init__(self, db_path, workers=4, retention=24 * 3600, lease=60, max_attempts=3, emit=None):
+        self.db_path = db_path
+        self.workers = max(0, workers)
+        self.retention = retention
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.emit = emit
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers = {}
+        self._cleanups = {}
+        self._running = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._started = False
+        self._stopping = False
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _create_tables(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    socket_id TEXT,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_until REAL,
+                    created REAL NOT NULL,
+                    started REAL,
+                    finished REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created)')
+
+    def register(self, kind, handler, cleanup=None):
+        """
+        Run handler(context) for jobs of this kind
+
+        The handler's return value (JSON-serializable) becomes the job's
+        result. cleanup(payload), if given, runs once the job is finished,
+        failed or cancelled (e.g. to delete uploaded files); it is not run
+        before a retry.
+        """
+        self._handlers[kind] = handler
+        if cleanup is not None:
+            self._cleanups[kind] = cleanup
+
+    def start(self):
+        """Create the database and start the worker threads, if any (safe to call repeatedly)"""
+        with self._lock:
+            if self._started:
+                return
+            self._create_tables()
+            self._started = True
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True).start()
+        threading.Thread(target=self._maintain, name='job-maintenance', daemon=True).start()
+
+    def stop(self):
+        self._stopping = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def submit(self, kind, payload, priority=0, socket_id=None):
+        if kind not in self._handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        try:
+            priority = int(priority)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid priority: {priority!r}')
+        self.start()
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, kind, priority, status, payload, socket_id, created) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, priority, 'queued', json.dumps(payload), socket_id, time.time())
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id):
+        """Job status as a dict, or None if there is no such job (or it expired)"""
+        self.start()
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = {
+                'id': row['id'],
+                'kind': row['kind'],
+                'status': row['status'],
+                'priority': row['priority'],
+                'attempts': row['attempts'],
+                'progress': json.loads(row['progress']) if row['progress'] else None,
+                'result': json.loads(row['result']) if row['result'] else None,
+                'error': row['error'],
+                'created': row['created'],
+                'started': row['started'],
+                'finished': row['finished']
+            }
+            if row['status'] == 'queued':
+                job['queue_position'] = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND "
+                    "(priority > ? OR (priority = ? AND created < ?))",
+                    (row['priority'], row['priority'], row['created'])
+                ).fetchone()[0]
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel a job: queued jobs never run, running ones stop at their next progress update
+
+        Returns:
+            False if the job doesn't exist or has already finished
+        """
+        self.start()
+        with self._connect() as conn:
+            row = conn.execute('SELECT kind, payload FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            dequeued = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            ).rowcount
+            if dequeued:
+                self._cleanup(row['kind'], json.loads(row['payload']))
+                return True
+            return bool(conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+            ).rowcount)
+
+    def stats(self):
+        if not self._started:
+            return {'started': False}
+        with self._connect() as conn:
+            counts = dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        with self._lock:
+            running_here = len(self._running)
+        return {'started': True, 'workers': self.workers, 'running_here': running_here, 'jobs': counts}
+
+    def _claim(self):
+        """Atomically take the next job, including jobs whose worker's lease ran out"""
+        now = time.time()
+        job = None
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Jobs abandoned by a dead process either go back to the queue or fail for good
+                lost = conn.execute(
+                    "SELECT id, kind, payload, socket_id FROM jobs "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, self.max_attempts)
+                ).fetchall()
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished = ?, error = 'Worker lost too many times' "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts)
+                )
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', owner = NULL WHERE status = 'running' AND lease_until < ?",
+                    (now,)
+                )
+                row = conn.execute(
+                    "SELECT id, kind, payload, socket_id, attempts FROM jobs WHERE status = 'queued' "
+                    "ORDER BY priority DESC, created LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, attempts = attempts + 1, "
+                        "started = ? WHERE id = ?",
+                        (self.owner, now + self.lease, now, row['id'])
+                    )
+                    job = row['id'], row['kind'], json.loads(row['payload']), row['socket_id'], row['attempts'] + 1
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        # Failed for good, so their files go now; nobody else will finish them
+        for row in lost:
+            payload = json.loads(row['payload'])
+            self._cleanup(row['kind'], payload)
+            context = JobContext(self, row['id'], row['kind'], payload, row['socket_id'])
+            context.emit('job_update', {'job_id': row['id'], 'kind': row['kind'], 'status': 'failed',
+                                        'error': 'Worker lost too many times'})
+        return job
+
+    def _finish(self, job_id, attempt, status, result=None, error=None):
+        """
+        Record the outcome of one run
+
+        Returns:
+            False if the run lost the job meanwhile: its lease ran out and the
+            job was claimed again (possibly by this process) or failed for good
+        """
+        with self._connect() as conn:
+            return bool(conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, lease_until = NULL "
+                "WHERE id = ? AND owner = ? AND attempts = ? AND status = 'running'",
+                (status, json.dumps(result) if result is not None else None, error, time.time(),
+                 job_id, self.owner, attempt)
+            ).rowcount)
+
+    def _set_progress(self, job_id, progress):
+        with self._connect() as conn:
+            conn.execute('UPDATE jobs SET progress = ? WHERE id = ?', (json.dumps(progress), job_id))
+
+    def _cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row is None or bool(row[0])
+
+    def _cleanup(self, kind, payload):
+        cleanup = self._cleanups.get(kind)
+        if cleanup is None:
+            return
+        try:
+            cleanup(payload)
+        except Exception as e:
+            print(f"Cleanup of a {kind} job failed: {e}")
+
+    def _run(self, job_id, kind, payload, socket_id, attempt):
+        context = JobContext(self, job_id, kind, payload, socket_id)
+        context.emit('job_update', {'job_id': job_id, 'kind': kind, 'status': 'running'})
+        try:
+            context.check_cancelled()
+            result = self._handlers[kind](context)
+            status, error = 'done', None
+        except JobCancelled:
+            result, status, error = None, 'cancelled', None
+        except Exception as e:
+            print(f"Job {job_id} ({kind}) failed: {e}")
+            result, status, error = None, 'failed', str(e)
+        # Only the worker that still owns the job may delete its files or report it finished
+        if not self._finish(job_id, attempt, status, result, error):
+            print(f"Job {job_id} ({kind}) was taken over by another worker; discarding this run's outcome")
+            return
+        self._cleanup(kind, payload)
+        context.emit('job_update', {'job_id': job_id, 'kind': kind, 'status': status, 'error': error})
+
+    def _work(self):
+        while not self._stopping:
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                print(f"Job queue unavailable: {e}")
+                job = None
+            if job is None:
+                # Also poll, since other processes may enqueue into the same file
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+            with self._lock:
+                self._running.add(job[0])
+            try:
+                self._run(*job)
+            finally:
+                with self._lock:
+                    self._running.discard(job[0])
+
+    def _maintain(self):
+        """Renew the leases of jobs running here and delete finished jobs past retention"""
+        while not self._stopping:
+            try:
+                now = time.time()
+                with self._lock:
+                    running = list(self._running)
+                with self._connect() as conn:
+                    if running:
+                        conn.executemany(
+                            "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                            [(now + self.lease, job_id, self.owner) for job_id in running]
+                        )
+                    conn.execute(
+                        f"DELETE FROM jobs WHERE status IN {FINISHED} AND finished < ?",
+                        (now - self.retention,)
+                    )
+            except sqlite3.Error as e:
+                print(f"Job queue maintenance failed: {e}")
+            time.sleep(self.lease / 3)
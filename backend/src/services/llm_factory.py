@@ -0,0 +1,25 @@
+import os
+
+
+class LLMFactory:
+    """Chat model clients for QuestionGenerationSystem, by provider name"""
+
+    DEFAULT_MODELS = {
+        'google': 'gemini-2.0-flash',
+        'openai': 'gpt-4o-mini'
+    }
+
+    def resolve_model(self, provider='google', model=None):
+        """The model create_llm will actually use for provider"""
+        return model or self.DEFAULT_MODELS.get(provider)
+
+    def create_llm(self, provider='google', model=None):
+        model = self.resolve_model(provider, model)
+        # Imported here so the server can start without the provider SDKs
+        if provider == 'google':
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            return ChatGoogleGenerativeAI(model=model, google_api_key=os.getenv('GOOGLE_API_KEY'))
+        if provider == 'openai':
+            from langchain_openai import ChatOpenAI
+            return ChatOpenAI(model=model, api_key=os.getenv('OPENAI_API_KEY'))
+        raise ValueError(f'Unknown LLM provider: {provider}')
@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from utils.blocking import run_blocking
+import os
+import queue
+import threading
+
+
+class OCRError(Exception):
+    """Raised when no OCR engine becomes free in time"""
+
+
+class TesseractPool:
+    """
+    Pool of long-lived in-process Tesseract engines (tesserocr)
+
+    Every engine loads its traineddata once and is then borrowed by one
+    request at a time, so an OCR call costs only the recognition instead of
+    a tesseract process start plus a reload of the language models. Engines
+    are created on demand, up to size of them.
+    """
+
+    backend = 'tesserocr'
+
+    def __init__(self, lang='ben+eng', size=1, tessdata_path=None, timeout=60):
+        # Engines already run side by side; keep each one from starting an OpenMP thread per core.
+        # Must be set before libtesseract is loaded.
+        os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self.size = max(1, size)
+        self.tessdata_path = tessdata_path
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # reuse the most recently used (cache-warm) engine first
+        self._lock = threading.Lock()
+        # Build the first engine now so a missing traineddata file fails at load time
+        self._idle.put(self._create())
+        self._created = 1
+
+    def _create(self):
+        kwargs = {'lang': self.lang}
+        if self.tessdata_path:
+            kwargs['path'] = self.tessdata_path
+        return self._tesserocr.PyTessBaseAPI(**kwargs)
+
+    def _try_reserve(self):
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    @contextmanager
+    def engine(self):
+        """Borrow an idle engine, creating one if the pool is not full yet"""
+        try:
+            api = self._idle.get_nowait()
+        except queue.Empty:
+            api = None
+            if self._try_reserve():
+                try:
+                    api = self._create()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            if api is None:
+                try:
+                    api = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise OCRError(f'No OCR engine became free within {self.timeout:.0f}s')
+        try:
+            yield api
+        finally:
+            api.Clear()
+            self._idle.put(api)
+
+    def recognize(self, image):
+        """
+        Run OCR on a PIL image
+
+        Returns:
+            (text, mean word confidence 0-100)
+        """
+        with self.engine() as api:
+            return run_blocking(self._recognize_with, api, image)
+
+    @staticmethod
+    def _recognize_with(api, image):
+        api.SetImage(image)
+        return api.GetUTF8Text(), api.MeanTextConf()
+
+    def stats(self):
+        with self._lock:
+            created = self._created
+        return {'backend': self.backend, 'engines': created, 'max_engines': self.size, 'idle': self._idle.qsize()}
+
+
+class PytesseractEngine:
+    """Fallback that runs the tesseract binary once per image through pytesseract"""
+
+    backend = 'pytesseract'
+
+    def __init__(self, lang='ben+eng', tessdata_path=None, tesseract_cmd=None):
+        import pytesseract
+
+        self._pytesseract = pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.lang = lang
+        self.config = f'--tessdata-dir "{tessdata_path}"' if tessdata_path else ''
+
+    def recognize(self, image):
+        return self._pytesseract.image_to_string(image, lang=self.lang, config=self.config), None
+
+    def stats(self):
+        return {'backend': self.backend}
+
+
+def create_ocr_engine(lang, size, tessdata_path=None, tesseract_cmd=None, timeout=60):
+    """
+    Build the Tesseract engine pool, falling back to pytesseract
+
+    Args:
+        lang (str): Tesseract languages, e.g. 'ben+eng'
+        size (int): Maximum number of engines (concurrent recognitions)
+        tessdata_path (str): Directory with the traineddata files, None for the default
+        tesseract_cmd (str): tesseract binary for the fallback, None to use PATH
+        timeout (float): Seconds a request waits for a free engine
+
+    Returns:
+        An engine with recognize(image) -> (text, confidence) and stats()
+    """
+    try:
+        return TesseractPool(lang, size=size, tessdata_path=tessdata_path, timeout=timeout)
+    except Exception as e:
+        print(f"WARNING: tesserocr unavailable ({e}); running the tesseract binary per image instead")
+        return PytesseractEngine(lang, tessdata_path=tessdata_path, tesseract_cmd=tesseract_cmd)
@@ -0,0 +1,155 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PIL import ImageSequence
+from services.ocr_engine import create_ocr_engine
+from services.ocr_preprocessor import ink_mask, to_grayscale
+import math
+import multiprocessing
+import numpy as np
+import threading
+
+# Tesseract engine owned by a pool worker process
+_worker_engine = None
+
+
+def _init_worker(lang, tessdata_path, tesseract_cmd):
+    """Runs once in each pool process: load one Tesseract engine with the languages"""
+    global _worker_engine
+    _worker_engine = create_ocr_engine(lang, 1, tessdata_path=tessdata_path, tesseract_cmd=tesseract_cmd)
+
+
+def _recognize(image, preprocessor=None):
+    """Worker task: optional preprocessing, then recognition; returns (text, confidence)"""
+    if preprocessor is not None:
+        image = preprocessor(image)
+    if image.mode not in ('1', 'L', 'RGB', 'RGBA'):
+        image = image.convert('RGB')
+    return _worker_engine.recognize(image)
+
+
+def iter_pages(image, max_pages=100):
+    """Yield each frame of a multi-page TIFF/GIF (or the single page) as its own image"""
+    for index, frame in enumerate(ImageSequence.Iterator(image)):
+        if index >= max_pages:
+            raise ValueError(f'Image has more than {max_pages} pages')
+        yield frame.copy()
+
+def split_bands(image, max_pixels):
+    """
+    Cut a large page into horizontal bands of at most ~max_pixels each
+
+    Cuts are moved to the emptiest row near each even split point, so they
+    fall between text lines and the bands read top to bottom in page order.
+    """
+    count = math.ceil(image.width * image.height / max_pixels)
+    if count <= 1:
+        return [image]
+    ink = ink_mask(to_grayscale(image)).mean(axis=1)
+    height = image.height / count
+    slack = int(height / 4)
+    cuts = [0]
+    for k in range(1, count):
+        target = int(k * height)
+        low, high = max(cuts[-1] + 1, target - slack), min(image.height - 1, target + slack)
+        if low >= high:
+            continue
+        window = ink[low:high]
+        # Of the emptiest rows in the window, take the one closest to the even split
+        candidates = np.flatnonzero(window == window.min()) + low
+        cuts.append(int(candidates[np.abs(candidates - target).argmin()]))
+    cuts.append(image.height)
+    return [image.crop((0, top, image.width, bottom)) for top, bottom in zip(cuts, cuts[1:]) if bottom > top]
+
+
+class OCRPagePool:
+    """
+    Process pool that recognizes pages (or bands of one large page) in parallel
+
+    Every worker process holds its own Tesseract engine, so pages are
+    recognized on all cores; pages() hands results back in reading order as
+    soon as each page is done.
+    """
+
+    def __init__(self, workers, lang='ben+eng', tessdata_path=None, tesseract_cmd=None):
+        self.workers = max(1, workers)
+        self._initargs = (lang, tessdata_path, tesseract_cmd)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn so workers don't inherit the parent's threads and model handles
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=self._initargs
+                )
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, image, preprocessor=None):
+        try:
+            return self._get_executor().submit(_recognize, image, preprocessor)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool and retry once
+            self._reset()
+            return self._get_executor().submit(_recognize, image, preprocessor)
+
+    def pages(self, pages, preprocessor=None, band_pixels=None):
+        """
+        Recognize pages in parallel, yielding one result per page in page order
+
+        Args:
+            pages: Iterable of PIL images
+            preprocessor: OCRPreprocessor applied to every page
+            band_pixels (int): Split pages larger than this (after preprocessing) into bands;
+                meant for single-page inputs, where there is no other page to run in parallel
+
+        Yields:
+            {'page', 'text', 'confidence', 'success'} (or 'error') for each page
+        """
+        in_flight = deque()
+
+        def submit_page(number, page):
+            if band_pixels:
+                # Preprocess here so the bands are cut from the cleaned-up page, then recognize them side by side
+                if preprocessor is not None:
+                    page = preprocessor(page)
+                return number, [self.submit(band) for band in split_bands(page, band_pixels)]
+            return number, [self.submit(page, preprocessor)]
+
+        def collect(number, futures):
+            try:
+                results = [future.result() for future in futures]
+            except Exception as e:
+                return {'page': number, 'error': str(e), 'success': False}
+            confidences = [confidence for _, confidence in results if confidence is not None]
+            page = {
+                'page': number,
+                'text': '\n'.join(text.strip() for text, _ in results).strip(),
+                'success': True
+            }
+            if confidences:
+                page['confidence'] = sum(confidences) / len(confidences)
+            return page
+
+        try:
+            for number, page in enumerate(pages, 1):
+                in_flight.append(submit_page(number, page))
+                # Hand back finished pages in order; keep at most two pages per worker queued
+                while in_flight and (all(f.done() for f in in_flight[0][1]) or len(in_flight) > 2 * self.workers):
+                    yield collect(*in_flight.popleft())
+            while in_flight:
+                yield collect(*in_flight.popleft())
+        finally:
+            for _, futures in in_flight:
+                for future in futures:
+                    future.cancel()
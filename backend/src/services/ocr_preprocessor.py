@@ -0,0 +1,153 @@
+from PIL import Image, ImageFilter, ImageOps
+import numpy as np
+
+STEPS = ('exif', 'grayscale', 'downscale', 'binarize', 'deskew', 'crop')
+
+
+def fix_orientation(image):
+    """Apply the EXIF orientation tag (phone photos are often stored sideways)"""
+    return ImageOps.exif_transpose(image)
+
+def downscale(image, target_dpi=300, max_pixels=8_000_000):
+    """
+    Shrink an image to what Tesseract needs; never upscales
+
+    Scans that carry a DPI tag are scaled to target_dpi. Photos without one
+    are capped at max_pixels, which keeps body text well above the ~20 px
+    x-height Tesseract works best at.
+    """
+    scale = 1.0
+    dpi = image.info.get('dpi')
+    if dpi and dpi[0] and float(dpi[0]) > target_dpi:
+        scale = target_dpi / float(dpi[0])
+    pixels = image.width * image.height * scale * scale
+    if pixels > max_pixels:
+        scale *= (max_pixels / pixels) ** 0.5
+    if scale >= 1.0:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+def to_grayscale(image):
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # Flatten transparency onto white so transparent areas don't turn black
+        rgba = image.convert('RGBA')
+        background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, rgba)
+    return image.convert('L')
+
+def ink_mask(gray, window=None, offset=0.15):
+    """
+    Adaptive (Bradley) threshold: True where a pixel is darker than its surroundings
+
+    Args:
+        gray (PIL.Image): Grayscale ('L') image
+        window (int): Neighbourhood size, defaults to 1/16 of the shorter side
+        offset (float): How much darker than the local mean a pixel must be
+    """
+    if window is None:
+        window = max(15, min(gray.size) // 16)
+    # Pillow's box blur is the local mean, computed in C in two separable passes
+    local_mean = np.asarray(gray.filter(ImageFilter.BoxBlur(window // 2)), dtype=np.float32)
+    return np.asarray(gray, dtype=np.float32) < local_mean * (1.0 - offset)
+
+def binarize(image, window=None, offset=0.15):
+    """Black text on white with a threshold that follows uneven lighting and shadows"""
+    mask = ink_mask(to_grayscale(image), window, offset)
+    return Image.fromarray(np.where(mask, 0, 255).astype(np.uint8), mode='L')
+
+def estimate_skew(mask, max_angle=10.0, step=0.25, sample=50_000):
+    """
+    Text line angle in degrees from the projection profile of the ink pixels
+
+    The ink coordinates are projected onto the y axis at each candidate angle;
+    the angle whose row histogram has the sharpest peaks (largest sum of
+    squared differences) lines the text rows up with the x axis.
+    """
+    ys, xs = np.nonzero(mask)
+    if len(ys) < 100:
+        return 0.0
+    if len(ys) > sample:
+        picked = np.random.default_rng(0).choice(len(ys), sample, replace=False)
+        ys, xs = ys[picked], xs[picked]
+    xs = xs - xs.mean()
+
+    angles = np.arange(-max_angle, max_angle + step / 2, step)
+    radians = np.deg2rad(angles)
+    # One row per candidate angle: the rotated y coordinate of every ink pixel
+    projected = np.rint(ys[None, :] * np.cos(radians)[:, None] - xs[None, :] * np.sin(radians)[:, None]).astype(np.int64)
+    projected -= projected.min(axis=1, keepdims=True)
+    width = projected.max() + 1
+    offsets = (np.arange(len(angles)) * width)[:, None]
+    histograms = np.bincount((projected + offsets).ravel(), minlength=len(angles) * width).reshape(len(angles), width)
+    scores = (np.diff(histograms, axis=1).astype(np.float64) ** 2).sum(axis=1)
+    return float(angles[scores.argmax()])
+
+def deskew(image, mask=None, max_angle=10.0):
+    """Rotate the page so text lines are horizontal"""
+    if mask is None:
+        mask = ink_mask(to_grayscale(image))
+    angle = estimate_skew(mask, max_angle)
+    if abs(angle) < 0.1:
+        return image
+    fill = 255 if image.mode in ('L', '1') else (255, 255, 255)
+    return image.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=fill)
+
+def crop_to_text(image, mask=None, margin=10, min_ink=0.002):
+    """Crop away borders that hold no text (table edges, desk, blank margins)"""
+    if mask is None:
+        mask = ink_mask(to_grayscale(image))
+    rows = np.flatnonzero(mask.mean(axis=1) > min_ink)
+    cols = np.flatnonzero(mask.mean(axis=0) > min_ink)
+    if len(rows) == 0 or len(cols) == 0:
+        return image
+    box = (
+        max(0, cols[0] - margin),
+        max(0, rows[0] - margin),
+        min(image.width, cols[-1] + margin + 1),
+        min(image.height, rows[-1] + margin + 1)
+    )
+    return image.crop(box)
+
+
+class OCRPreprocessor:
+    """
+    Image cleanup in front of Tesseract
+
+    Runs the enabled steps in a fixed order: EXIF orientation, grayscale,
+    DPI-aware downscale, adaptive binarization, deskew, text-region crop.
+    The ink mask from binarization is reused by deskew and crop.
+    """
+
+    def __init__(self, steps=STEPS, target_dpi=300, max_pixels=8_000_000):
+        unknown = set(steps) - set(STEPS)
+        if unknown:
+            raise ValueError(f"Unknown OCR preprocessing steps: {', '.join(sorted(unknown))}")
+        self.steps = [step for step in STEPS if step in steps]
+        self.target_dpi = target_dpi
+        self.max_pixels = max_pixels
+
+    def __call__(self, image):
+        steps = self.steps
+        if 'exif' in steps:
+            image = fix_orientation(image)
+        # Grayscale first: resizing one channel is three times cheaper than RGB
+        if 'grayscale' in steps or 'binarize' in steps:
+            image = to_grayscale(image)
+        if 'downscale' in steps:
+            image = downscale(image, self.target_dpi, self.max_pixels)
+
+        mask = None
+        if 'binarize' in steps:
+            mask = ink_mask(image)
+            image = Image.fromarray(np.where(mask, 0, 255).astype(np.uint8), mode='L')
+
+        if 'deskew' in steps:
+            rotated = deskew(image, mask)
+            if rotated is not image:
+                image = rotated
+                # A rotated binary page only needs re-thresholding at mid-gray
+                mask = np.asarray(image) < 128 if mask is not None else None
+        if 'crop' in steps:
+            image = crop_to_text(image, mask)
+        return image
@@ -0,0 +1,195 @@
+from langchain_core.documents import Document
+from config.settings import Config
+import re
+import unicodedata
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# Sentence ends: Latin punctuation and the Bengali danda/double danda
+SENTENCE_END = re.compile(r'(?<=[.!?।॥])\s+')
+VIRAMA = '\u09cd'  # hasant: joins the next consonant into a conjunct
+JOINERS = {'\u200c', '\u200d'}  # ZWNJ, ZWJ
+
+
+def estimate_tokens(text):
+    """
+    Cheap token estimate: about 4 UTF-8 bytes per token
+
+    Works for both scripts: English averages ~4 characters per BPE token, and
+    Bengali characters take 3 bytes each and split into roughly one token per
+    1-2 characters.
+    """
+    return max(1, (len(text.encode('utf-8')) + 3) // 4)
+
+def tiktoken_counter(encoding_name):
+    """Exact token counts for an OpenAI tokenizer (requires tiktoken)"""
+    import tiktoken
+
+    encoding = tiktoken.get_encoding(encoding_name)
+    return lambda text: max(1, len(encoding.encode(text, disallowed_special=())))
+
+def _grapheme_breaks(text):
+    """Offsets where text can be cut without splitting a Bengali conjunct or a vowel sign from its letter"""
+    for i in range(1, len(text)):
+        char, previous = text[i], text[i - 1]
+        if unicodedata.category(char).startswith('M') or char in JOINERS:
+            continue
+        if previous == VIRAMA or previous in JOINERS:
+            continue
+        yield i
+
+
+class TextChunker:
+    """
+    Token-budgeted chunker for extracted PDF and OCR text
+
+    Pages are split into paragraphs and paragraphs into sentences (ending in
+    . ! ? or the Bengali danda); sentences are packed into chunks of at most
+    chunk_tokens, cutting at a paragraph boundary when one leaves the chunk
+    at least half full. Each chunk starts with up to overlap_tokens worth of
+    whole sentences from the end of the previous one. Sentences longer than
+    a chunk are split between words, and words between grapheme clusters.
+
+    chunk_pages() is a generator, so a document is never held as one string.
+    """
+
+    def __init__(self, chunk_tokens=800, overlap_tokens=100, count_tokens=estimate_tokens):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError('overlap_tokens must be smaller than chunk_tokens')
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens
+
+    def _split_long(self, text):
+        """Split a sentence that exceeds the budget between words, then inside words if needed"""
+        piece, piece_tokens = [], 0
+        for word in text.split():
+            tokens = self.count_tokens(word)
+            if tokens > self.chunk_tokens:
+                if piece:
+                    yield ' '.join(piece)
+                    piece, piece_tokens = [], 0
+                yield from self._split_word(word)
+                continue
+            if piece and piece_tokens + tokens > self.chunk_tokens:
+                yield ' '.join(piece)
+                piece, piece_tokens = [], 0
+            piece.append(word)
+            piece_tokens += tokens + 1
+        if piece:
+            yield ' '.join(piece)
+
+    def _split_word(self, word):
+        start = 0
+        last_break = None
+        for i in _grapheme_breaks(word):
+            if self.count_tokens(word[start:i]) > self.chunk_tokens and last_break:
+                yield word[start:last_break]
+                start = last_break
+            last_break = i
+        yield word[start:]
+
+    def _units(self, pages):
+        """Yield (text, tokens, page, starts_paragraph) sentence units"""
+        for page, text in pages:
+            for paragraph in PARAGRAPH_BREAK.split(text):
+                # Single newlines inside a paragraph are just line wraps
+                paragraph = ' '.join(paragraph.split())
+                if not paragraph:
+                    continue
+                first = True
+                for sentence in SENTENCE_END.split(paragraph):
+                    tokens = self.count_tokens(sentence)
+                    parts = [(sentence, tokens)] if tokens <= self.chunk_tokens else \
+                        [(part, self.count_tokens(part)) for part in self._split_long(sentence)]
+                    for part, part_tokens in parts:
+                        yield part, part_tokens, page, first
+                        first = False
+
+    def _cut_point(self, buffer, carried):
+        """Index to end the chunk at: the last paragraph start that leaves it at least half full"""
+        total = sum(unit[1] for unit in buffer)
+        for i in range(len(buffer) - 1, carried, -1):
+            total -= buffer[i][1]
+            if total < self.chunk_tokens / 2:
+                break
+            if buffer[i][3]:
+                return i
+        return len(buffer)
+
+    def _overlap(self, emitted):
+        tail, tokens = [], 0
+        for unit in reversed(emitted[1:]):
+            if tokens + unit[1] > self.overlap_tokens:
+                break
+            tail.insert(0, unit)
+            tokens += unit[1]
+        return tail
+
+    def _pack(self, units):
+        buffer, total, carried = [], 0, 0
+        for unit in units:
+            while buffer and total + unit[1] > self.chunk_tokens:
+                if len(buffer) == carried:
+                    # Only the overlap is left and it doesn't fit with this unit; drop it
+                    buffer, total, carried = [], 0, 0
+                    break
+                cut = self._cut_point(buffer, carried)
+                yield buffer[:cut]
+                tail = self._overlap(buffer[:cut])
+                buffer = tail + buffer[cut:]
+                total = sum(u[1] for u in buffer)
+                carried = len(tail)
+            buffer.append(unit)
+            total += unit[1]
+        if len(buffer) > carried:
+            yield buffer
+
+    @staticmethod
+    def _join(units):
+        parts = []
+        for i, (text, _, _, starts_paragraph) in enumerate(units):
+            if i:
+                parts.append('\n\n' if starts_paragraph else ' ')
+            parts.append(text)
+        return ''.join(parts)
+
+    def chunk_pages(self, pages, metadata=None):
+        """
+        Chunk a stream of pages
+
+        Args:
+            pages: Iterable of (page_number, text); page_number may be None
+            metadata (dict): Copied into every chunk's metadata (e.g. source)
+
+        Yields:
+            Documents with page_content and metadata chunk_id, page_start,
+            page_end and tokens (total_chunks is not known until the end)
+        """
+        for chunk_id, units in enumerate(self._pack(self._units(pages))):
+            yield Document(
+                page_content=self._join(units),
+                metadata={
+                    **(metadata or {}),
+                    'chunk_id': chunk_id,
+                    'page_start': units[0][2],
+                    'page_end': units[-1][2],
+                    'tokens': sum(unit[1] for unit in units)
+                }
+            )
+
+    def chunk_text(self, text, metadata=None):
+        """Chunk a single text (e.g. OCR output)"""
+        return self.chunk_pages([(None, text)], metadata)
+
+
+def number_chunks(chunks):
+    """Materialize chunks and fill in total_chunks"""
+    chunks = list(chunks)
+    for chunk in chunks:
+        chunk.metadata['total_chunks'] = len(chunks)
+    return chunks
+
+def create_chunker():
+    """TextChunker configured from CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS and CHUNK_TOKENIZER"""
+    count_tokens = tiktoken_counter(Config.CHUNK_TOKENIZER) if Config.CHUNK_TOKENIZER else estimate_tokens
+    return TextChunker(Config.CHUNK_TOKENS, Config.CHUNK_OVERLAP_TOKENS, count_tokens)
@@ -0,0 +1,197 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config.settings import Config
+import multiprocessing
+import threading
+import time
+
+# Per-process OCR engine and preprocessor for pages without a text layer
+_ocr = None
+
+
+def _open(path):
+    """Open a PDF with PyMuPDF, or pypdfium2 when PyMuPDF is not installed"""
+    try:
+        import pymupdf
+        return 'pymupdf', pymupdf.open(path)
+    except ImportError:
+        import pypdfium2
+        return 'pdfium', pypdfium2.PdfDocument(path)
+
+def page_count(path):
+    backend, document = _open(path)
+    try:
+        return len(document)
+    finally:
+        document.close()
+
+def _page_text(backend, document, index):
+    page = document[index]
+    if backend == 'pymupdf':
+        return page.get_text('text')
+    textpage = page.get_textpage()
+    try:
+        return textpage.get_text_range()
+    finally:
+        textpage.close()
+
+def _may_hold_scan(backend, document, index):
+    """False for pages with no embedded image at all (blank pages are not worth OCR)"""
+    if backend == 'pymupdf':
+        return bool(document[index].get_images(full=False))
+    return True
+
+def _render_page(backend, document, index, dpi):
+    """Rasterize a page to a grayscale PIL image for OCR"""
+    page = document[index]
+    if backend == 'pymupdf':
+        from PIL import Image
+        pixmap = page.get_pixmap(dpi=dpi, colorspace='gray', alpha=False)
+        return Image.frombytes('L', (pixmap.width, pixmap.height), pixmap.samples)
+    return page.render(scale=dpi / 72, grayscale=True).to_pil()
+
+def _ocr_page(image):
+    global _ocr
+    if _ocr is None:
+        from services.ocr_engine import create_ocr_engine
+        from services.ocr_preprocessor import OCRPreprocessor
+        engine = create_ocr_engine(
+            Config.OCR_LANG, 1,
+            tessdata_path=Config.TESSDATA_PREFIX,
+            tesseract_cmd=Config.TESSERACT_CMD
+        )
+        # The page is rendered upright and in grayscale already
+        steps = [step for step in Config.OCR_PREPROCESS_STEPS if step not in ('exif', 'downscale')]
+        _ocr = engine, OCRPreprocessor(steps)
+    engine, preprocess = _ocr
+    text, _ = engine.recognize(preprocess(image))
+    return text
+
+def extract_page_range(path, start, stop, ocr=True, min_chars=20, ocr_dpi=300):
+    """
+    Extract the text of pages [start, stop) of one PDF
+
+    Pages whose text layer has fewer than min_chars characters but which
+    embed an image (scans, photographed pages) are rendered at ocr_dpi and
+    OCR'd instead.
+
+    Returns:
+        List of {'page', 'text', 'method'} with 1-based page numbers and
+        method 'text', 'ocr' or 'empty'
+    """
+    backend, document = _open(path)
+    pages = []
+    try:
+        for index in range(start, min(stop, len(document))):
+            text = _page_text(backend, document, index).strip()
+            method = 'text'
+            if len(text) < min_chars:
+                method = 'empty'
+                if ocr and _may_hold_scan(backend, document, index):
+                    ocr_text = _ocr_page(_render_page(backend, document, index, ocr_dpi)).strip()
+                    if len(ocr_text) > len(text):
+                        text, method = ocr_text, 'ocr'
+            pages.append({'page': index + 1, 'text': text, 'method': method})
+    finally:
+        document.close()
+    return pages
+
+
+class PDFExtractor:
+    """
+    Parallel PDF text extraction
+
+    A document is split into ranges of pages_per_task pages; each range is
+    opened and extracted in its own worker process (MuPDF documents can't be
+    shared between threads), and pages are handed back in order as soon as
+    every page before them is done. Small documents are extracted in-process
+    to skip the IPC round trip.
+    """
+
+    def __init__(self, workers=None, pages_per_task=None, ocr=True, min_chars=None, ocr_dpi=None):
+        self.workers = max(1, workers or Config.PDF_WORKERS)
+        self.pages_per_task = pages_per_task or Config.PDF_PAGES_PER_TASK
+        self.options = {
+            'ocr': ocr,
+            'min_chars': Config.PDF_MIN_TEXT_CHARS if min_chars is None else min_chars,
+            'ocr_dpi': ocr_dpi or Config.PDF_OCR_DPI
+        }
+        self._executor = None
+        self._lock = threading.Lock()
+        self._totals = {'documents': 0, 'pages': 0, 'ocr_pages': 0, 'seconds': 0.0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _reset(self, broken):
+        """Shut down a broken pool and whatever is left of its processes, unless another thread already did"""
+        with self._lock:
+            if self._executor is broken:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _submit(self, path, start, stop):
+        executor = self._get_executor()
+        try:
+            return executor.submit(extract_page_range, path, start, stop, **self.options)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool and retry once
+            self._reset(executor)
+            return self._get_executor().submit(extract_page_range, path, start, stop, **self.options)
+
+    def iter_pages(self, path):
+        """
+        Yield {'page', 'text', 'method'} for every page of a PDF, in page order
+
+        Extraction statistics (pages/sec, OCR'd pages) are logged when the
+        document is done and accumulated for stats().
+        """
+        started = time.perf_counter()
+        total = page_count(path)
+        ranges = [(start, min(start + self.pages_per_task, total)) for start in range(0, total, self.pages_per_task)]
+        ocr_pages = 0
+
+        if self.workers == 1 or len(ranges) <= 1:
+            batches = (extract_page_range(path, start, stop, **self.options) for start, stop in ranges)
+        else:
+            batches = self._parallel(path, ranges)
+
+        for batch in batches:
+            for page in batch:
+                ocr_pages += page['method'] == 'ocr'
+                yield page
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._totals['documents'] += 1
+            self._totals['pages'] += total
+            self._totals['ocr_pages'] += ocr_pages
+            self._totals['seconds'] += elapsed
+        print(f"Extracted {total} PDF pages in {elapsed:.2f}s "
+              f"({total / elapsed if elapsed else 0:.1f} pages/s, {ocr_pages} OCR'd)")
+
+    def _parallel(self, path, ranges):
+        # Keep a bounded window of ranges in flight so huge documents don't queue everything at once
+        pending = deque(ranges)
+        in_flight = deque()
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < 2 * self.workers:
+                    in_flight.append(self._submit(path, *pending.popleft()))
+                yield in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def stats(self):
+        with self._lock:
+            totals = dict(self._totals)
+        totals['pages_per_second'] = totals['pages'] / totals['seconds'] if totals['seconds'] else 0.0
+        return totals
@@ -1,35 +1,134 @@
-from typing import Dict, List, Any, Generator
+from typing import Annotated, Dict, List, Any, Generator, TypedDict
 from langchain_core.prompts import ChatPromptTemplate
-from langgraph.graph import StateGraph, END
-import json
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+from config.settings import Config
+from services.pdf_chunker import create_chunker, estimate_tokens, number_chunks
+from services.pdf_extractor import PDFExtractor
+from services.question_dedup import QuestionDeduplicator
+from utils.cache import ResultCache, hash_bytes
+from utils.json_stream import JSONObjectStream
 import logging
+import operator
+import os
+import re
+import tempfile
 import uuid
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Section headers in a batched summary ("### Section 2", "**Section 2:**", ...)
+SECTION_HEADER = re.compile(r'^\W*Section\s+(\d+)\W*$', re.MULTILINE | re.IGNORECASE)
+# Version tag of the cached summaries and questions; bump it when the prompts change
+PROMPT_VERSION = "1"
+
+class PDFProcessor:
+    def __init__(self, extractor=None, chunker=None):
+        """Turn uploaded PDFs into chunks for fact checking and question generation
+        
+        Args:
+            extractor: PDFExtractor to use (a shared parallel one by default)
+            chunker: TextChunker to use (configured from CHUNK_* by default)
+        """
+        self.extractor = extractor or PDFExtractor()
+        self.chunker = chunker or create_chunker()
+    
+    def iter_chunks(self, filepath):
+        """Yield chunks as pages are extracted, without holding the whole document"""
+        pages = ((page['page'], page['text']) for page in self.extractor.iter_pages(filepath) if page['text'])
+        return self.chunker.chunk_pages(pages, {'source': os.path.basename(filepath)})
+    
+    def process_pdf(self, filepath):
+        """Extract and chunk a PDF
+        
+        Args:
+            filepath: Path to the PDF file
+            
+        Returns:
+            (chunks, chunk_count); ([], 0) if the PDF can't be read
+        """
+        try:
+            chunks = number_chunks(self.iter_chunks(filepath))
+            return chunks, len(chunks)
+        except Exception as e:
+            logger.error(f"PDF extraction failed for {filepath}: {str(e)}")
+            return [], 0
+    
+    def process_upload(self, file):
+        """Extract and chunk an uploaded PDF (werkzeug FileStorage)"""
+        # Extraction workers open the file by path, so spool the upload to disk
+        fd, path = tempfile.mkstemp(suffix='.pdf')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                file.save(f)
+            chunks, chunk_count = self.process_pdf(path)
+            for chunk in chunks:
+                chunk.metadata['source'] = file.filename
+            return chunks, chunk_count
+        finally:
+            os.remove(path)
+    
+    def stats(self):
+        return self.extractor.stats()
+
+class ParallelQuestionState(TypedDict, total=False):
+    chunks: list
+    questions_per_chunk: int
+    summaries: dict
+    # Each process_chunk task appends its own result; the lists are concatenated
+    all_results: Annotated[list, operator.add]
+
 class QuestionGenerationSystem:
-    def __init__(self, llm_factory, llm_provider="openai", model=None):
+    def __init__(self, llm_factory, llm_provider="openai", model=None, concurrency=None, summary_batch_tokens=None,
+                 deduplicator=None):
         """Initialize the question generation system
         
         Args:
-            llm_factory: Factory to create LLM instances
+            llm_factory: Factory with create_llm() and resolve_model(), e.g. LLMFactory
             llm_provider: The LLM provider to use
             model: Specific model to use
+            concurrency: Chunks processed at once (1 runs the sequential graph)
+            summary_batch_tokens: Pack consecutive chunks into one summarization
+                request up to this many tokens (0 summarizes every chunk on its own)
+            deduplicator: QuestionDeduplicator for the final list (by default one is
+                created unless QUESTION_DEDUP is off)
         """
         self.llm_factory = llm_factory
         self.llm_provider = llm_provider
-        self.model = model
+        # The effective name, not None, so changing a factory default also changes the cache keys
+        self.model = llm_factory.resolve_model(llm_provider, model)
+        self.concurrency = concurrency or Config.QUESTION_GEN_CONCURRENCY
+        self.summary_batch_tokens = Config.QUESTION_GEN_SUMMARY_BATCH_TOKENS if summary_batch_tokens is None else summary_batch_tokens
+        if deduplicator is None and Config.QUESTION_DEDUP:
+            deduplicator = QuestionDeduplicator()
+        self.deduplicator = deduplicator
+        
+        # Summaries keyed by chunk text, question sets by summary and count; the model is part of both keys
+        cache_options = {
+            "ttl": Config.QUESTION_CACHE_TTL,
+            "db_path": Config.QUESTION_CACHE_DB or None,
+            "max_entries": Config.QUESTION_CACHE_SIZE
+        }
+        self.summary_cache = ResultCache("question_summaries", PROMPT_VERSION, **cache_options)
+        self.question_cache = ResultCache("question_sets", PROMPT_VERSION, **cache_options)
         self.orchestrator_llm = llm_factory.create_llm(
             provider=llm_provider, 
-            model=model
+            model=self.model
         )
         self.worker_llm = llm_factory.create_llm(
             provider=llm_provider,
-            model=model
+            model=self.model
         )
         
+        # Prompt chains are stateless, so build them once and share them between chunks
+        self.summarization_chain = self._create_summarization_chain()
+        self.batch_summarization_chain = self._create_batch_summarization_chain()
+        self.question_chain = self._create_question_generation_chain()
+        
     def _create_summarization_chain(self):
         """Create a chain to summarize chunks"""
         prompt = ChatPromptTemplate.from_template(
@@ -42,6 +141,19 @@ class QuestionGenerationSystem:
         
         return prompt | self.worker_llm
         
+    def _create_batch_summarization_chain(self):
+        """Create a chain to summarize several short chunks in one request"""
+        prompt = ChatPromptTemplate.from_template(
+            """Summarize each of the following {count} sections separately to capture its key concepts, facts, and ideas:
+            
+            {sections}
+            
+            Provide a concise summary of every section that would be useful for generating MCQ questions.
+            Answer with one block per section, in the same order, each starting with its header line exactly as given (e.g. "### Section 1")."""
+        )
+        
+        return prompt | self.worker_llm
+        
     def _create_question_generation_chain(self):
         """Create a chain to generate questions from summaries"""
         prompt = ChatPromptTemplate.from_template(
@@ -87,50 +199,66 @@ class QuestionGenerationSystem:
         
         return prompt | self.worker_llm
     
+    def _summary_key(self, chunk):
+        digest = hash_bytes(chunk.page_content.encode("utf-8"))
+        return self.summary_cache.make_key(digest, provider=self.llm_provider, model=self.model)
+    
+    def _question_key(self, summary, num_questions):
+        digest = hash_bytes(summary.encode("utf-8"))
+        return self.question_cache.make_key(digest, provider=self.llm_provider, model=self.model,
+                                            num_questions=num_questions)
+    
     def _process_chunk(self, state: dict) -> dict:
         """Process a single chunk to generate questions"""
         try:
             chunk = state["current_chunk"]
             logger.info(f"Processing chunk: {chunk.metadata.get('chunk_id', 'unknown')} of {chunk.metadata.get('total_chunks', 'unknown')}")
             
-            summarization_chain = self._create_summarization_chain()
-            
-            # First summarize the chunk
-            summary = summarization_chain.invoke({"chunk_content": chunk.page_content})
+            # First summarize the chunk, unless it was summarized in a batch or an earlier run already
+            summary = state.get("summary")
+            if summary is None:
+                summary_key = self._summary_key(chunk)
+                summary = self.summary_cache.get(summary_key)
+                if summary is None:
+                    summary = self.summarization_chain.invoke({"chunk_content": chunk.page_content}).content
+                    self.summary_cache.set(summary_key, summary)
             
             # Then generate questions from the summary
-            question_chain = self._create_question_generation_chain()
-            
-            questions_response = question_chain.invoke({
-                "content": summary.content,
-                "num_questions": state.get("questions_per_chunk", 3)
-            })
+            num_questions = state.get("questions_per_chunk", 3)
+            question_key = self._question_key(summary, num_questions)
+            chunk_id = chunk.metadata.get("chunk_id", "unknown")
+            emit = self._stream_writer()
+            questions = self.question_cache.get(question_key)
+            if questions is not None:
+                questions = [dict(q) for q in questions]
+                for question in questions:
+                    emit({"chunk_id": chunk_id, "question": question})
+                return {**state, "chunk_results": {"chunk_id": chunk_id, "questions": questions}}
             
-            # Extract JSON from response
+            # Stream the answer and hand each question on as soon as its object closes
+            questions = []
             try:
-                questions = self._extract_json(questions_response.content)
-                
-                # Add unique IDs to questions if not already present
-                for q in questions:
-                    if "id" not in q:
-                        q["id"] = f"q-{uuid.uuid4().hex[:8]}"
-                
-                return {
-                    **state,
-                    "chunk_results": {
-                        "chunk_id": chunk.metadata.get("chunk_id", "unknown"),
-                        "questions": questions
-                    }
-                }
+                for question in self._stream_questions(summary, num_questions):
+                    questions.append(question)
+                    emit({"chunk_id": chunk_id, "question": question})
             except Exception as e:
-                logger.error(f"JSON extraction failed: {str(e)}")
+                if not questions:
+                    raise
+                # Keep what already reached the client, but don't cache a partial set
+                logger.error(f"Question stream for chunk {chunk_id} broke off: {str(e)}")
+                return {**state, "chunk_results": {"chunk_id": chunk_id, "questions": questions}}
+            
+            if not questions:
                 return {
                     **state,
                     "chunk_results": {
-                        "chunk_id": chunk.metadata.get("chunk_id", "unknown"),
-                        "error": str(e)
+                        "chunk_id": chunk_id,
+                        "error": "No valid questions in the model response"
                     }
                 }
+            
+            self.question_cache.set(question_key, questions)
+            return {**state, "chunk_results": {"chunk_id": chunk_id, "questions": questions}}
         except Exception as e:
             logger.error(f"Error in _process_chunk: {str(e)}")
             chunk_id = "unknown"
@@ -144,74 +272,72 @@ class QuestionGenerationSystem:
                 }
             }
     
-    def _extract_json(self, text):
-        """Extract JSON from LLM response text"""
-        if not isinstance(text, str):
-            logger.warning(f"_extract_json expected string but got {type(text)}")
-            if hasattr(text, 'content'): 
-                text = text.content
-            elif isinstance(text, dict) and 'content' in text: 
-                text = text['content']
-            else: 
-                text = str(text)
-
+    @staticmethod
+    def _stream_writer():
+        """Custom-stream writer of the running graph (a no-op outside one)"""
         try:
-            # Try finding ```json blocks first
-            json_match = None
-            if "```json" in text:
-                match = text.split("```json", 1)
-                if len(match) > 1 and "```" in match[1]:
-                    json_match = match[1].split("```", 1)[0].strip()
-            # Fallback to finding plain ``` blocks
-            elif "```" in text:
-                match = text.split("```", 1)
-                if len(match) > 1 and "```" in match[1]:
-                    json_match = match[1].split("```", 1)[0].strip()
-
-            if json_match:
-                json_str = json_match
-            else:
-                # Fallback: Try to find the first '[' or '{' and parse from there
-                first_bracket = -1
-                first_curly = -1
-                try: first_bracket = text.index('[')
-                except ValueError: pass
-                try: first_curly = text.index('{')
-                except ValueError: pass
-
-                if first_bracket != -1 and (first_curly == -1 or first_bracket < first_curly):
-                    json_str = text[first_bracket:]
-                elif first_curly != -1:
-                    json_str = text[first_curly:]
-                else:
-                    json_str = text
-
-            return json.loads(json_str)
-
-        except json.JSONDecodeError:
-            # Attempt cleanup
-            cleaned_json = ''.join(c for c in text if ord(c) < 128)  # Basic ASCII clean
-            cleaned_json = cleaned_json.replace("'", '"').replace("\\'", "'").replace('\\"', '"')  # Handle quotes
-            
-            try:
-                return json.loads(cleaned_json)
-            except json.JSONDecodeError:
-                # Last resort: return a single dummy question to avoid breaking the flow
-                return [{"id": f"q-error-{uuid.uuid4().hex[:8]}",
-                       "question": "Error extracting questions from this section", 
-                       "options": {"A": "Error", "B": "Error", "C": "Error", "D": "Error"}, 
-                       "answer": "A",
-                       "hints": ["Error processing this content"],
-                       "difficulty": "Medium"}]
-        except Exception as e:
-            logger.error(f"Unexpected error during JSON extraction: {e}")
-            # Return minimal valid result as fallback
-            return [{"id": f"q-error-{uuid.uuid4().hex[:8]}",
-                   "question": "Error processing this section", 
-                   "options": {"A": "Error", "B": "Error", "C": "Error", "D": "Error"}, 
-                   "answer": "A",
-                   "hints": ["Error processing this content"],
-                   "difficulty": "Medium"}]
+            return get_stream_writer()
+        except RuntimeError:
+            return lambda payload: None
+    
+    @staticmethod
+    def _message_text(message):
+        """Text of a streamed message chunk (some providers send a list of content parts)"""
+        content = getattr(message, "content", message)
+        if isinstance(content, list):
+            return "".join(part if isinstance(part, str) else part.get("text", "") for part in content)
+        return content if isinstance(content, str) else str(content)
+    
+    @staticmethod
+    def _clean_question(raw):
+        """Normalize one parsed question object, or None if it isn't a usable MCQ"""
+        question, options = raw.get("question"), raw.get("options")
+        if not isinstance(question, str) or not question.strip():
+            return None
+        if not isinstance(options, dict):
+            return None
+        # Accept "c" or "C)" as option keys and "C", "c" or "C) Paris" as the answer
+        options = {str(key).strip().rstrip(").:").upper(): value for key, value in options.items()}
+        if len(options) < 2:
+            return None
+        answer = str(raw.get("answer", "")).strip()[:1].upper()
+        if answer not in options:
+            return None
+        cleaned = {**raw, "options": options, "answer": answer}
+        if "id" not in cleaned:
+            cleaned["id"] = f"q-{uuid.uuid4().hex[:8]}"
+        return cleaned
+    
+    def _stream_questions(self, summary, num_questions):
+        """Generate questions for a summary, yielding each valid one as soon as the model closes it"""
+        parser = JSONObjectStream()
+        
+        def parsed_objects():
+            for message in self.question_chain.stream({"content": summary, "num_questions": num_questions}):
+                for raw in parser.feed(self._message_text(message)):
+                    yield raw, False
+            for raw in parser.close():
+                yield raw, True
+        
+        skipped = 0
+        for raw, truncated in parsed_objects():
+            # Some models wrap the array as {"questions": [...]}
+            items = raw["questions"] if isinstance(raw.get("questions"), list) else [raw]
+            if truncated and items:
+                # The question being written when the response ended may be missing fields or
+                # end mid-string, so only the ones before it are kept (and cached)
+                items = items[:-1]
+                skipped += 1
+            for item in items:
+                question = self._clean_question(item) if isinstance(item, dict) else None
+                if question is None:
+                    skipped += 1
+                    continue
+                yield question
+        
+        skipped += parser.skipped
+        if skipped:
+            logger.warning(f"Skipped {skipped} malformed question objects")
     
     def _should_process_or_end(self, state: dict) -> str:
         """Decide whether to process the next chunk or end the workflow."""
@@ -245,6 +371,7 @@ class QuestionGenerationSystem:
                 **state,
                 "current_chunk": current_chunk,
                 "current_chunk_index": next_index + 1,
+                "summary": state.get("summaries", {}).get(next_index),
                 "progress": {
                     "current": next_index + 1,
                     "total": len(state["chunks"])
@@ -298,6 +425,193 @@ class QuestionGenerationSystem:
         compiled_graph = workflow.compile()
         return compiled_graph
     
+    def _fan_out(self, state: dict) -> list:
+        """Send every chunk to its own process_chunk task"""
+        return [
+            Send("process_chunk", {
+                "current_chunk": chunk,
+                "chunk_index": index,
+                "summary": state.get("summaries", {}).get(index),
+                "questions_per_chunk": state.get("questions_per_chunk", 3)
+            })
+            for index, chunk in enumerate(state["chunks"])
+        ]
+    
+    def _map_chunk(self, state: dict) -> dict:
+        """Process one chunk inside the fan-out and tag the result with its position"""
+        result = self._process_chunk(state)["chunk_results"]
+        return {"all_results": [{**result, "chunk_index": state["chunk_index"]}]}
+    
+    def build_parallel_graph(self):
+        """Build a map-reduce graph that processes all chunks concurrently"""
+        workflow = StateGraph(ParallelQuestionState)
+        workflow.add_node("process_chunk", self._map_chunk)
+        workflow.add_conditional_edges(START, self._fan_out, ["process_chunk"])
+        workflow.add_edge("process_chunk", END)
+        
+        logger.info("Compiling parallel question generation workflow graph")
+        return workflow.compile()
+    
+    def _final_output(self, all_results):
+        """Merge per-chunk results into the final response"""
+        all_questions = []
+        errors = []
+        for chunk_result in all_results:
+            if "questions" in chunk_result and isinstance(chunk_result["questions"], list):
+                all_questions.extend(chunk_result["questions"])
+            elif "error" in chunk_result:
+                errors.append(f"Chunk {chunk_result.get('chunk_id', 'N/A')}: {chunk_result['error']}")
+
+        # Overlapping chunks tend to produce the same question more than once
+        duplicates = 0
+        if self.deduplicator is not None:
+            all_questions, duplicates = self.deduplicator.dedupe(all_questions)
+
+        return {
+            "status": "complete" if not errors else "complete_with_errors",
+            "questions": all_questions,
+            "total_questions": len(all_questions),
+            "duplicates_removed": duplicates,
+            "errors": errors,
+            "message": f"Generated {len(all_questions)} questions." + (f" Encountered {len(errors)} errors." if errors else "")
+        }
+    
+    def _pack_summary_batches(self, chunks, indexes):
+        """Group consecutive chunks into summarization requests of at most summary_batch_tokens"""
+        batches, batch, batch_tokens = [], [], 0
+        for index in indexes:
+            chunk = chunks[index]
+            tokens = chunk.metadata.get("tokens") or estimate_tokens(chunk.page_content)
+            if batch and (batch_tokens + tokens > self.summary_batch_tokens
+                          or len(batch) >= Config.QUESTION_GEN_SUMMARY_BATCH_SIZE):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    @staticmethod
+    def _split_summaries(text, count):
+        """Split a batched summary into one summary per section (None where a section is missing)"""
+        parts = SECTION_HEADER.split(text)
+        summaries = [None] * count
+        for number, body in zip(parts[1::2], parts[2::2]):
+            index = int(number) - 1
+            if 0 <= index < count and body.strip():
+                summaries[index] = body.strip()
+        return summaries
+    
+    def _summarize_batch(self, batch):
+        """Summarize a list of chunks with one request; returns one summary per chunk"""
+        if len(batch) == 1:
+            return [self.summarization_chain.invoke({"chunk_content": batch[0].page_content}).content]
+        
+        sections = "\n\n".join(f"### Section {i}\n{chunk.page_content}" for i, chunk in enumerate(batch, 1))
+        response = self.batch_summarization_chain.invoke({"count": len(batch), "sections": sections})
+        summaries = self._split_summaries(response.content, len(batch))
+        
+        # The model merged or dropped some sections; summarize those on their own
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            logger.warning(f"Batched summary is missing {len(missing)} of {len(batch)} sections; retrying them one by one")
+            retried = self.summarization_chain.batch(
+                [{"chunk_content": batch[i].page_content} for i in missing],
+                {"max_concurrency": self.concurrency}
+            )
+            for i, response in zip(missing, retried):
+                summaries[i] = response.content
+        return summaries
+    
+    def _iter_summaries(self, chunks, indexes):
+        """Summarize chunks in packed requests, yielding {chunk_index: summary} as each request finishes"""
+        batches = self._pack_summary_batches(chunks, indexes)
+        logger.info(f"Summarizing {len(indexes)} chunks in {len(batches)} requests")
+        
+        summarize = RunnableLambda(lambda indexes: self._summarize_batch([chunks[i] for i in indexes]))
+        for position, result in summarize.batch_as_completed(
+                batches, {"max_concurrency": self.concurrency}, return_exceptions=True):
+            if isinstance(result, Exception):
+                # Left without a summary, these chunks are summarized individually in _process_chunk
+                logger.error(f"Batched summarization failed for chunks {batches[position]}: {str(result)}")
+                continue
+            for index, summary in zip(batches[position], result):
+                self.summary_cache.set(self._summary_key(chunks[index]), summary)
+            yield dict(zip(batches[position], result))
+    
+    def _summarize_chunks(self, chunks):
+        """Run the batched summarization stage, yielding progress updates and finally the summaries"""
+        summaries = {}
+        for index, chunk in enumerate(chunks):
+            summary = self.summary_cache.get(self._summary_key(chunk))
+            if summary is not None:
+                summaries[index] = summary
+        if summaries:
+            logger.info(f"Reusing {len(summaries)} cached chunk summaries")
+        
+        missing = [index for index in range(len(chunks)) if index not in summaries]
+        for batch_summaries in self._iter_summaries(chunks, missing) if missing else ():
+            summaries.update(batch_summaries)
+            yield {
+                "status": "in_progress",
+                "stage": "summarizing",
+                "progress": {"current": len(summaries), "total": len(chunks)},
+                "current_chunk_display": 0,
+                "total_chunks": len(chunks),
+                "results_count": 0
+            }
+        return summaries
+    
+    def _generate_parallel(self, chunks, questions_per_chunk, summaries=None):
+        """Fan chunks out with at most self.concurrency LLM pipelines in flight"""
+        workflow = self.build_parallel_graph()
+        
+        all_results = []
+        config = {"max_concurrency": self.concurrency, "recursion_limit": 10}
+        initial_state = {
+            "chunks": chunks,
+            "questions_per_chunk": questions_per_chunk,
+            "summaries": summaries or {},
+            "all_results": []
+        }
+        
+        # "updates" reports each chunk as soon as its task finishes, "custom" each question as it is parsed
+        for mode, payload in workflow.stream(initial_state, config, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                yield self._question_event(payload, len(all_results), len(chunks))
+                continue
+            for update in payload.values():
+                all_results.extend((update or {}).get("all_results", []))
+            yield {
+                "status": "in_progress",
+                "progress": {"current": len(all_results), "total": len(chunks)},
+                "current_chunk_display": len(all_results),
+                "total_chunks": len(chunks),
+                "results_count": len(all_results)
+            }
+        
+        # Tasks finish in any order; report questions in document order
+        all_results.sort(key=lambda result: result["chunk_index"])
+        yield self._final_output(all_results)
+    
+    @staticmethod
+    def _question_event(payload, done, total):
+        """Progress update carrying one freshly generated question"""
+        return {
+            "status": "in_progress",
+            "stage": "questions",
+            "question": payload["question"],
+            "chunk_id": payload["chunk_id"],
+            "progress": {"current": done, "total": total},
+            "current_chunk_display": done,
+            "total_chunks": total,
+            "results_count": done
+        }
+    
+    def cache_stats(self):
+        return {"summaries": self.summary_cache.stats(), "questions": self.question_cache.stats()}
+    
     def generate_questions(self, chunks, questions_per_chunk=3):
         """Generate questions from document chunks using stream"""
         logger.info(f"Starting question generation with {len(chunks)} chunks, {questions_per_chunk} questions per chunk")
@@ -310,12 +624,34 @@ class QuestionGenerationSystem:
             }
             return
 
+        # Short chunks share summarization requests; whatever this misses is summarized per chunk
+        summaries = {}
+        if self.summary_batch_tokens and len(chunks) > 1:
+            try:
+                summaries = yield from self._summarize_chunks(chunks)
+            except Exception as e:
+                logger.error(f"Batched summarization failed: {str(e)}")
+
+        if self.concurrency > 1:
+            try:
+                yield from self._generate_parallel(chunks, questions_per_chunk, summaries)
+            except Exception as e:
+                logger.error(f"Parallel workflow failed: {str(e)}")
+                yield {
+                    "status": "error",
+                    "message": f"Error during question generation workflow: {str(e)}",
+                    "questions": [],
+                    "total_questions": 0
+                }
+            return
+
         workflow = self.build_graph()
 
         initial_state = {
             "chunks": chunks,
             "current_chunk_index": 0,
             "questions_per_chunk": questions_per_chunk,
+            "summaries": summaries,
             "all_results": [],
             "progress": {"current": 0, "total": len(chunks)}
         }
@@ -325,7 +661,13 @@ class QuestionGenerationSystem:
         final_state = None
         try:
             # Stream the execution
-            for i, state_update in enumerate(workflow.stream(initial_state, {"recursion_limit": recursion_limit})):
+            stream = workflow.stream(initial_state, {"recursion_limit": recursion_limit}, stream_mode=["updates", "custom"])
+            for mode, state_update in stream:
+                if mode == "custom":
+                    done = len(final_state.get("all_results", [])) if final_state else 0
+                    yield self._question_event(state_update, done, len(chunks))
+                    continue
+                
                 # Get the actual state dictionary
                 last_node = list(state_update.keys())[-1]
                 current_state = state_update[last_node]
@@ -343,24 +685,7 @@ class QuestionGenerationSystem:
                 final_state = current_state  # Keep track of the latest state
 
             # Process the final state after the stream completes
-            all_results = final_state.get("all_results", [])
-
-            all_questions = []
-            errors = []
-            for chunk_result in all_results:
-                if "questions" in chunk_result and isinstance(chunk_result["questions"], list):
-                    all_questions.extend(chunk_result["questions"])
-                elif "error" in chunk_result:
-                    errors.append(f"Chunk {chunk_result.get('chunk_id', 'N/A')}: {chunk_result['error']}")
-
-            final_output = {
-                "status": "complete" if not errors else "complete_with_errors",
-                "questions": all_questions,
-                "total_questions": len(all_questions),
-                "errors": errors,
-                "message": f"Generated {len(all_questions)} questions." + (f" Encountered {len(errors)} errors." if errors else "")
-            }
-            yield final_output
+            yield self._final_output(final_state.get("all_results", []))
 
         except Exception as e:
             logger.error(f"Workflow stream failed: {str(e)}")
@@ -0,0 +1,90 @@
+from collections import Counter, deque
+from concurrent.futures import Future
+from utils.blocking import run_blocking
+import numpy as np
+import queue
+import threading
+import time
+
+
+class PhotoBatcher:
+    """
+    Dynamic batching in front of a local photo classifier
+
+    Request threads decode and resize their own image, then wait while a
+    single scheduler thread collects up to max_batch_size images (or whatever
+    arrived within max_wait_ms of the first one), runs one forward pass on the
+    stacked tensor and hands each request its own result.
+    """
+
+    def __init__(self, classifier, max_batch_size=16, max_wait_ms=10):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._waits = deque(maxlen=1000)  # seconds each request spent queued
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='photo-batcher', daemon=True)
+                self._thread.start()
+
+    def classify(self, data):
+        """Classify one image's bytes as part of the next batch"""
+        pixels = self.classifier.preprocess(data)
+        future = Future()
+        self._ensure_started()
+        self._queue.put((pixels, future, time.monotonic()))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.monotonic()
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._waits.extend(started - queued for _, _, queued in batch)
+            try:
+                logits = run_blocking(self.classifier.predict_batch, np.stack([pixels for pixels, _, _ in batch]))
+                for (_, future, _), row in zip(batch, logits):
+                    future.set_result(self.classifier.postprocess(row))
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            batches = sum(self._batch_sizes.values())
+            requests = sum(size * count for size, count in self._batch_sizes.items())
+
+        def percentile(p):
+            return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000 if waits else 0.0
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': batches,
+            'requests': requests,
+            'mean_batch_size': requests / batches if batches else 0.0,
+            'batch_size_histogram': {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            'queue_wait_ms': {'p50': percentile(0.50), 'p99': percentile(0.99)}
+        }
@@ -0,0 +1,200 @@
+from abc import ABC, abstractmethod
+from PIL import Image
+from utils.blocking import run_blocking
+import httpx
+import io
+import json
+import numpy as np
+import os
+import threading
+
+
+class PhotoClassifierError(Exception):
+    """Raised when a photo cannot be classified by a backend"""
+
+
+class InvalidImageError(ValueError):
+    """Raised for uploads that are not a decodable image"""
+
+
+def validate_image(data):
+    """Fully decode image bytes once, raising InvalidImageError if they are not a usable image"""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+    except Exception as e:
+        raise InvalidImageError(f'Not a valid image: {e}') from e
+
+
+class LocalPhotoClassifier(ABC):
+    """
+    Base class for in-process bird photo classifiers
+
+    Labels and preprocessing (input size, rescale factor, mean/std) are read
+    from the HuggingFace snapshot of chriamue/bird-species-classifier, so an
+    exported model produces the same labels as the hosted API.
+    """
+
+    backend = None
+
+    def __init__(self, model_path, model_dir, top_k=5):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Photo classifier model not found: {model_path}")
+
+        with open(os.path.join(model_dir, 'config.json'), encoding='utf-8') as f:
+            config = json.load(f)
+        with open(os.path.join(model_dir, 'preprocessor_config.json'), encoding='utf-8') as f:
+            preprocessor = json.load(f)
+
+        self.labels = [config['id2label'][str(i)] for i in range(len(config['id2label']))]
+        self.size = (preprocessor['size']['width'], preprocessor['size']['height'])
+        self.resample = preprocessor.get('resample', Image.BILINEAR)
+        self.rescale_factor = preprocessor.get('rescale_factor', 1 / 255) if preprocessor.get('do_rescale', True) else 1.0
+        self.mean = np.array(preprocessor['image_mean'], dtype=np.float32)
+        self.std = np.array(preprocessor['image_std'], dtype=np.float32)
+        self.do_normalize = preprocessor.get('do_normalize', True)
+        self.top_k = top_k
+        self.version = f"{self.backend}:{os.path.basename(model_path)}"
+
+    def preprocess(self, data):
+        """Decode image bytes into a normalized HWC float32 array"""
+        try:
+            image = Image.open(io.BytesIO(data)).convert('RGB').resize(self.size, self.resample)
+        except Exception as e:
+            raise InvalidImageError(f'Not a valid image: {e}') from e
+        pixels = np.asarray(image, dtype=np.float32) * self.rescale_factor
+        if self.do_normalize:
+            pixels = (pixels - self.mean) / self.std
+        return pixels
+
+    @abstractmethod
+    def predict_batch(self, batch):
+        """Run the model on an (N, H, W, 3) batch and return (N, num_labels) logits"""
+
+    def postprocess(self, logits):
+        """Turn one row of logits into the top_k [{'label', 'score'}, ...]"""
+        exp = np.exp(logits - logits.max())
+        scores = exp / exp.sum()
+        top = np.argsort(scores)[::-1][:self.top_k]
+        return [{'label': self.labels[i], 'score': float(scores[i])} for i in top]
+
+    def classify_many(self, images):
+        """Classify a list of image byte strings with one forward pass"""
+        batch = np.stack([self.preprocess(data) for data in images])
+        return [self.postprocess(row) for row in run_blocking(self.predict_batch, batch)]
+
+    def classify(self, data):
+        """Return [{'label', 'score'}, ...] for the top_k species in one image"""
+        return self.classify_many([data])[0]
+
+
+class OnnxPhotoClassifier(LocalPhotoClassifier):
+    backend = 'onnx'
+
+    def __init__(self, model_path, model_dir, top_k=5):
+        super().__init__(model_path, model_dir, top_k)
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.channels_first = model_input.shape[1] == 3
+        self.fixed_batch = model_input.shape[0] == 1
+
+    def predict_batch(self, batch):
+        if self.channels_first:
+            batch = batch.transpose(0, 3, 1, 2)
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        if self.fixed_batch:
+            return np.concatenate([self.session.run(None, {self.input_name: row[None]})[0] for row in batch])
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class TFLitePhotoClassifier(LocalPhotoClassifier):
+    backend = 'tflite'
+
+    def __init__(self, model_path, model_dir, top_k=5):
+        super().__init__(model_path, model_dir, top_k)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite.python.interpreter import Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path, num_threads=os.cpu_count())
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.channels_first = self.interpreter.get_input_details()[0]['shape'][1] == 3
+        self._batch_size = 1
+        # A TFLite interpreter must not be used from two threads at once
+        self._lock = threading.Lock()
+
+    def predict_batch(self, batch):
+        if self.channels_first:
+            batch = batch.transpose(0, 3, 1, 2)
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = batch.shape[0]
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+
+class RemotePhotoClassifier:
+    """HuggingFace Inference API backend (one HTTP round-trip per photo)"""
+
+    backend = 'remote'
+
+    def __init__(self, api_url, token, version, http, timeout=30):
+        self.api_url = api_url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.version = version
+        self.http = http
+        self.timeout = timeout
+
+    def classify(self, data):
+        response = self.http.post(
+            self.api_url,
+            headers={"Content-Type": "image/jpeg", **self.headers},
+            content=data,
+            timeout=httpx.Timeout(self.timeout, connect=self.http.timeout.connect)
+        )
+        if response.status_code != 200:
+            raise PhotoClassifierError(f'Failed to analyze image: {response.text}')
+        return response.json()
+
+    def classify_many(self, images):
+        return [self.classify(data) for data in images]
+
+
+LOCAL_BACKENDS = {
+    'onnx': OnnxPhotoClassifier,
+    'tflite': TFLitePhotoClassifier
+}
+
+def create_photo_classifier(backend, model_path, model_dir, remote, top_k=5):
+    """
+    Build the configured classifier, falling back to the remote API
+
+    Args:
+        backend (str): 'onnx', 'tflite' or 'remote'
+        model_path (str): Exported model file for the local backends
+        model_dir (str): HuggingFace snapshot with config.json/preprocessor_config.json
+        remote (RemotePhotoClassifier): Fallback backend
+        top_k (int): Number of species returned per photo
+
+    Returns:
+        A classifier with classify(data) and classify_many(images)
+    """
+    if backend == 'remote':
+        return remote
+    if backend not in LOCAL_BACKENDS:
+        raise ValueError(f"Unknown photo classifier backend '{backend}'")
+    try:
+        return LOCAL_BACKENDS[backend](model_path, model_dir, top_k=top_k)
+    except Exception as e:
+        print(f"WARNING: {backend} photo classifier unavailable ({e}); using the HuggingFace API instead")
+        return remote
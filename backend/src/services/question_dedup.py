@@ -0,0 +1,105 @@
+from config.settings import Config
+from services.embeddings import sentence_embeddings
+from utils.blocking import run_blocking
+import logging
+import numpy as np
+import re
+
+logger = logging.getLogger(__name__)
+
+
+def question_text(question):
+    """Text a question is compared by: its stem plus the text of the correct option"""
+    options = question.get("options") or {}
+    answer = options.get(question.get("answer"), "") if isinstance(options, dict) else ""
+    return f"{question.get('question', '')} {answer}".strip()
+
+def _exact_key(text):
+    return re.sub(r'\W+', ' ', text.casefold()).strip()
+
+def find_duplicates(vectors, threshold, block_size=1024):
+    """
+    Greedy near-duplicate detection over L2-normalized row vectors
+
+    A row is a duplicate when its cosine similarity to an earlier kept row is
+    at least threshold, so the first occurrence always survives. Rows are
+    compared block by block: one matrix product against every row kept so
+    far, then one against the earlier rows of the same block. Memory stays
+    at block_size x n similarities and the Python loop runs once per row,
+    never once per pair.
+
+    Returns:
+        Boolean mask of the rows to keep
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    keep = np.ones(len(vectors), dtype=bool)
+    kept = np.empty_like(vectors)
+    kept_count = 0
+
+    for start in range(0, len(vectors), block_size):
+        block = vectors[start:start + block_size]
+        alive = np.ones(len(block), dtype=bool)
+        if kept_count:
+            alive &= (block @ kept[:kept_count].T).max(axis=1) < threshold
+
+        within = block @ block.T
+        for i in range(len(block)):
+            if alive[i]:
+                alive[i + 1:] &= within[i, i + 1:] < threshold
+
+        keep[start:start + len(block)] = alive
+        survivors = block[alive]
+        kept[kept_count:kept_count + len(survivors)] = survivors
+        kept_count += len(survivors)
+    return keep
+
+
+class QuestionDeduplicator:
+    """
+    Drop repeated and near-duplicate MCQs from a generated question list
+
+    Overlapping chunks make the model ask the same thing more than once.
+    Exact repeats (ignoring case and punctuation) are removed first; the
+    rest are embedded with MiniLM and pruned with find_duplicates(). If the
+    embedding model can't be loaded only exact repeats are removed.
+    """
+
+    def __init__(self, threshold=None, block_size=None, embeddings=sentence_embeddings):
+        self.threshold = Config.QUESTION_DEDUP_THRESHOLD if threshold is None else threshold
+        self.block_size = Config.QUESTION_DEDUP_BLOCK_SIZE if block_size is None else block_size
+        if self.block_size < 1:
+            raise ValueError('block_size must be at least 1')
+        self.embeddings = embeddings
+
+    def _embed(self, texts):
+        vectors = np.asarray(run_blocking(self.embeddings.get().embed_documents, texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def dedupe(self, questions):
+        """
+        Args:
+            questions: Question dicts in document order
+
+        Returns:
+            (kept questions in their original order, number removed)
+        """
+        seen = set()
+        unique, texts = [], []
+        for question in questions:
+            text = question_text(question)
+            key = _exact_key(text)
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(question)
+            texts.append(text)
+
+        if len(unique) > 1:
+            try:
+                keep = run_blocking(find_duplicates, self._embed(texts), self.threshold, self.block_size)
+                unique = [question for question, kept in zip(unique, keep) if kept]
+            except Exception as e:
+                logger.warning(f"Near-duplicate check skipped: {str(e)}")
+
+        return unique, len(questions) - len(unique)
@@ -0,0 +1,83 @@
+import numpy as np
+import threading
+import time
+
+
+class SemanticCache:
+    """
+    Fact-check result cache keyed by query meaning rather than exact text
+
+    Query embeddings are L2-normalized and stored as rows of one NumPy matrix,
+    so a lookup is a single matrix-vector product. A stored result is reused
+    when its query's cosine similarity to the new one is at least threshold
+    and it is younger than ttl seconds. When full, the oldest entry is
+    overwritten.
+    """
+
+    def __init__(self, threshold=0.92, ttl=6 * 3600, max_entries=5000):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._vectors = None
+        self._created = np.zeros(max_entries)
+        self._queries = [None] * max_entries
+        self._results = [None] * max_entries
+        self._count = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector):
+        """
+        Find the closest fresh entry for a normalized query vector
+
+        Returns:
+            tuple: (cached query, cached result, similarity), or None on a miss
+        """
+        with self._lock:
+            size = min(self._count, self.max_entries)
+            if size:
+                similarities = self._vectors[:size] @ vector
+                similarities[self._created[:size] < time.time() - self.ttl] = -1.0
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.hits += 1
+                    return self._queries[best], self._results[best], float(similarities[best])
+            self.misses += 1
+            return None
+
+    def add(self, vector, query, result):
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            slot = self._count % self.max_entries
+            self._vectors[slot] = vector
+            self._created[slot] = time.time()
+            self._queries[slot] = query
+            self._results[slot] = result
+            self._count += 1
+
+    def clear(self):
+        with self._lock:
+            self._count = 0
+            self._queries = [None] * self.max_entries
+            self._results = [None] * self.max_entries
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': min(self._count, self.max_entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,21 @@
+import sys
+
+
+def gevent_patched():
+    """True when the process runs under the gevent server (serve.py monkey-patches threading)"""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+def run_blocking(func, *args, **kwargs):
+    """
+    Call long-running native code (BirdNET, Tesseract, ONNX Runtime, embeddings) without stalling the server
+
+    Under gevent every request and background "thread" is a greenlet on one
+    OS thread, so a C call holding it for hundreds of milliseconds freezes
+    every socket; the call is run in gevent's pool of real threads instead.
+    Otherwise it is simply called.
+    """
+    if gevent_patched():
+        import gevent
+        return gevent.get_hub().threadpool.apply(func, args, kwargs)
+    return func(*args, **kwargs)
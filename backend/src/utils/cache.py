@@ -0,0 +1,234 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters and optional TTL"""
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                value, expires = self._data[key]
+                if expires is None or expires > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() to fill it on a miss"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class SQLiteCache:
+    """
+    On-disk JSON value cache shared by every process that opens the same file
+
+    Entries are namespaced, carry a version tag and an expiry time, and the
+    least recently used rows are evicted once a namespace holds more than
+    max_entries rows.
+    """
+
+    def __init__(self, path, namespace, version='', ttl=None, max_entries=10000):
+        self.path = path
+        self.namespace = namespace
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires REAL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed)')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT value FROM cache WHERE namespace = ? AND key = ? AND version = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.namespace, key, self.version, now)
+            ).fetchone()
+            if row is None:
+                return default
+            conn.execute('UPDATE cache SET accessed = ? WHERE namespace = ? AND key = ?',
+                         (now, self.namespace, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        expires = now + self.ttl if self.ttl else None
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (namespace, key, version, value, expires, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (self.namespace, key, self.version, json.dumps(value), expires, now)
+            )
+            conn.execute(
+                'DELETE FROM cache WHERE namespace = ? AND key IN ('
+                'SELECT key FROM cache WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.namespace, self.namespace, self.max_entries)
+            )
+
+    def purge(self):
+        """Drop expired rows and rows written by another version"""
+        with self._connect() as conn:
+            conn.execute(
+                'DELETE FROM cache WHERE namespace = ? AND (version != ? OR expires <= ?)',
+                (self.namespace, self.version, time.time())
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM cache WHERE namespace = ?', (self.namespace,))
+
+
+class ResultCache:
+    """
+    Analysis result cache keyed by content hash plus analysis parameters
+
+    A size-bounded in-process LRU sits in front of an optional SQLite tier
+    (enabled by passing db_path). The model version is part of every key, so
+    changing it invalidates all earlier results; stale rows are purged from
+    the SQLite tier on startup.
+    """
+
+    def __init__(self, name, model_version, maxsize=1024, ttl=None, db_path=None, max_entries=10000):
+        self.name = name
+        self.model_version = model_version
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = None
+        if db_path:
+            self.disk = SQLiteCache(db_path, name, version=model_version, ttl=ttl, max_entries=max_entries)
+            self.disk.purge()
+        # The memory tier counts its own hits; misses are only counted once both tiers missed
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+
+    def make_key(self, digest, **params):
+        """Combine a content digest (see hash_stream/hash_bytes) with the analysis parameters"""
+        payload = json.dumps([self.model_version, digest, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key, default=None):
+        sentinel = object()
+        value = self.memory.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key, sentinel)
+            if value is not sentinel:
+                with self._lock:
+                    self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def invalidate(self, model_version=None):
+        """Forget every cached result, optionally switching to a new model version"""
+        if model_version is not None:
+            self.model_version = model_version
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.version = self.model_version
+            self.disk.clear()
+
+    def stats(self):
+        memory = self.memory.stats()
+        with self._lock:
+            disk_hits, misses = self.disk_hits, self.misses
+        hits = memory['hits'] + disk_hits
+        lookups = hits + misses
+        return {
+            'size': memory['size'],
+            'maxsize': memory['maxsize'],
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_hits': memory['hits'],
+            'disk_hits': disk_hits,
+            'model_version': self.model_version,
+            'disk_enabled': self.disk is not None
+        }
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_stream(stream, block_size=1024 * 1024):
+    """SHA-256 of a seekable stream; the stream is rewound afterwards"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(block_size), b''):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
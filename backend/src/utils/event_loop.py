@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+
+class BackgroundEventLoop:
+    """
+    One asyncio event loop running in a daemon thread
+
+    Request threads hand coroutines to it with run(); all of them make
+    progress concurrently on the same loop instead of each request thread
+    spinning up its own loop and blocking on it.
+    """
+
+    def __init__(self, name='async-worker'):
+        self.name = name
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True).start()
+            return self._loop
+
+    def submit(self, coro):
+        """Schedule a coroutine and return a concurrent.futures.Future for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the shared loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+
+# Shared by every request that needs to run async code (fact checks)
+background_loop = BackgroundEventLoop()
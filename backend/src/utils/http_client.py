@@ -0,0 +1,219 @@
+from config.settings import Config
+from urllib.parse import urlsplit
+import asyncio
+import httpx
+import random
+import threading
+import time
+import weakref
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast for reset_timeout seconds; then a single trial call is let
+    through and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        """End a call that says nothing about the host (cancelled, invalid request) so a trial can run again"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class OutboundHTTP:
+    """
+    Shared client for outbound model and search calls
+
+    Keeps pooled keep-alive connections (one sync client, one async client per
+    event loop), caps concurrent requests per host, applies connect/read
+    timeouts, retries transport errors and 429/5xx responses with jittered
+    exponential backoff, and trips a per-host circuit breaker when an upstream
+    keeps failing.
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=30.0, max_connections=100, per_host_limit=20,
+                 retries=2, backoff_base=0.25, backoff_max=4.0, breaker_threshold=5, breaker_reset=30.0):
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncClient
+        self._host_slots = {}
+        self._async_host_slots = weakref.WeakKeyDictionary()  # event loop -> {host: Semaphore}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(timeout=self.timeout, limits=self.limits)
+            return self._client
+
+    def _async_client(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+                self._async_clients[loop] = client
+            return client
+
+    def _breaker(self, host):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self._breakers[host]
+
+    def _slot(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _async_slot(self, host):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._async_host_slots.setdefault(loop, {})
+            if host not in slots:
+                slots[host] = asyncio.Semaphore(self.per_host_limit)
+            return slots[host]
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _check_breaker(self, host):
+        breaker = self._breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f'Circuit open for {host}; not calling it for now')
+        return breaker
+
+    def request(self, method, url, **kwargs):
+        """Send a request from a worker thread; returns the final httpx.Response"""
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            breaker = self._check_breaker(host)
+            try:
+                with self._slot(host):
+                    response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+            except BaseException:
+                # Otherwise a half-open circuit would wait for this trial's verdict forever
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt == self.retries:
+                    return response
+            time.sleep(self._backoff(attempt))
+
+    async def arequest(self, method, url, **kwargs):
+        """Send a request without blocking the event loop; returns the final httpx.Response"""
+        host = urlsplit(url).netloc
+        client = self._async_client()
+        for attempt in range(self.retries + 1):
+            breaker = self._check_breaker(host)
+            try:
+                async with self._async_slot(host):
+                    response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+            except BaseException:
+                # Otherwise a half-open circuit would wait for this trial's verdict forever
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt == self.retries:
+                    return response
+            await asyncio.sleep(self._backoff(attempt))
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    async def apost(self, url, **kwargs):
+        return await self.arequest('POST', url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: {'state': breaker.state, 'failures': breaker.failures} for host, breaker in breakers.items()}
+
+
+# Shared by the photo classifier and the fact-check search
+outbound_http = OutboundHTTP(
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.HTTP_READ_TIMEOUT,
+    max_connections=Config.HTTP_MAX_CONNECTIONS,
+    per_host_limit=Config.HTTP_PER_HOST_LIMIT,
+    retries=Config.HTTP_RETRIES,
+    backoff_base=Config.HTTP_BACKOFF_BASE,
+    backoff_max=Config.HTTP_BACKOFF_MAX,
+    breaker_threshold=Config.HTTP_BREAKER_THRESHOLD,
+    breaker_reset=Config.HTTP_BREAKER_RESET
+)
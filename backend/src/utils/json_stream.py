@@ -0,0 +1,124 @@
+import ast
+import json
+import re
+
+TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+DANGLING_KEY = re.compile(r'(?<=[{,])\s*"(?:[^"\\]|\\.)*"\s*:?$')
+LITERAL_NAMES = {'true': True, 'false': False, 'null': None}
+
+
+def repair_json(text):
+    """
+    Parse one JSON value as LLMs tend to write it
+
+    Tries, in order: strict JSON that allows raw newlines inside strings,
+    the same without trailing commas, and a Python-literal reading that
+    accepts single-quoted strings (true/false/null are still understood).
+    Non-ASCII text is kept as is.
+
+    Returns:
+        The parsed value, or None if every attempt failed
+    """
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        pass
+    without_commas = TRAILING_COMMA.sub(r'\1', text)
+    try:
+        return json.loads(without_commas, strict=False)
+    except json.JSONDecodeError:
+        pass
+    try:
+        tree = ast.parse(without_commas.strip(), mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    for node in ast.walk(tree):
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, ast.Name) and value.id in LITERAL_NAMES:
+                setattr(node, field, ast.Constant(LITERAL_NAMES[value.id]))
+            elif isinstance(value, list):
+                value[:] = [ast.Constant(LITERAL_NAMES[item.id])
+                            if isinstance(item, ast.Name) and item.id in LITERAL_NAMES else item
+                            for item in value]
+    try:
+        return ast.literal_eval(tree)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+class JSONObjectStream:
+    """
+    Pull complete top-level JSON objects out of streamed LLM text
+
+    feed() takes text as it arrives and returns every object that closed in
+    it, so callers can act on the first object while the model is still
+    writing the rest. Anything between objects (markdown fences, the
+    enclosing array brackets, commas, prose) is ignored. Brackets inside
+    double-quoted strings are not counted.
+
+    Objects that don't parse even after repair_json() are counted in
+    skipped and dropped on their own; the stream carries on with the next
+    one. close() salvages an object cut off by the end of the response; its
+    last member (or the last item of a list it ends in) may be cut short.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._open = []  # unclosed '{' and '[' of the current object
+        self._in_string = False
+        self._escaped = False
+        self.skipped = 0
+
+    def _finish(self, text):
+        value = repair_json(text)
+        if isinstance(value, dict):
+            return [value]
+        self.skipped += 1
+        return []
+
+    def feed(self, text):
+        """Consume a piece of the response; returns the objects completed in it"""
+        objects = []
+        for char in text:
+            if not self._open:
+                if char == '{':
+                    self._buffer = [char]
+                    self._open = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._open.append(char)
+            elif char in '}]':
+                self._open.pop()
+                if not self._open:
+                    objects.extend(self._finish(''.join(self._buffer)))
+                    self._buffer = []
+        return objects
+
+    def close(self):
+        """End of the response: try to close a truncated object and return it (it is incomplete)"""
+        if not self._open:
+            return []
+        text = ''.join(self._buffer)
+        if self._escaped:
+            text = text[:-1]
+        if self._in_string:
+            text += '"'
+        text = text.rstrip()
+        if self._open[-1] == '{':
+            # A key whose value never arrived
+            text = DANGLING_KEY.sub('', text)
+        text = text.rstrip().rstrip(',:')
+        objects = self._finish(text + ''.join('}' if char == '{' else ']' for char in reversed(self._open)))
+        self._buffer, self._open, self._in_string, self._escaped = [], [], False, False
+        return objects
@@ -0,0 +1,69 @@
+import threading
+import time
+
+_registry = {}
+
+
+class LazyModel:
+    """
+    Build an expensive object (a model, a client) on first use
+
+    The factory runs at most once even when several request threads ask for
+    the object at the same time. A failed load is reported by status() and
+    retried on the next call.
+    """
+
+    def __init__(self, name, factory, register=True):
+        self.name = name
+        self._factory = factory
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_seconds = None
+        self.error = None
+        if register:
+            _registry[name] = self
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    self.error = str(e)
+                    raise
+                self.load_seconds = time.perf_counter() - started
+                self.error = None
+                self._loaded = True
+        return self._value
+
+    def status(self):
+        return {
+            'loaded': self._loaded,
+            'load_seconds': self.load_seconds,
+            'error': self.error
+        }
+
+
+def model_status():
+    """Load state of every registered model"""
+    return {name: model.status() for name, model in _registry.items()}
+
+def preload(names=None):
+    """Load the named models (default: all registered), logging failures instead of raising"""
+    for name, model in list(_registry.items()):
+        if names is not None and name not in names:
+            continue
+        try:
+            model.get()
+            print(f"Loaded {name} in {model.load_seconds:.1f}s")
+        except Exception as e:
+            print(f"WARNING: Failed to load {name}: {e}")
+    return model_status()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The app runs with src/ as its first path entry; backend/config.py would otherwise
+# shadow the src/config namespace package when pytest is started from backend/
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != BACKEND]
+sys.path.insert(0, os.path.join(BACKEND, 'src'))
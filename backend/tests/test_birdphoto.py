@@ -0,0 +1,88 @@
+from flask import Flask
+from services.photo_classifier import InvalidImageError
+from utils.cache import ResultCache
+from PIL import Image
+import birdphoto
+import io
+import pytest
+
+
+class Loaded:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class FakeRemote:
+    version = 'remote'
+
+    def __init__(self):
+        self.calls = 0
+
+    def classify(self, data):
+        self.calls += 1
+        return [{'label': 'HOUSE SPARROW', 'score': 0.9}]
+
+
+class FailingLocal:
+    version = 'onnx:model.onnx'
+
+    def __init__(self, error):
+        self.error = error
+
+    def classify(self, data):
+        raise self.error
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    remote = FakeRemote()
+    monkeypatch.setattr(birdphoto, 'remote_classifier', remote)
+    monkeypatch.setattr(birdphoto, 'photo_batcher', Loaded(None))
+    return remote
+
+
+def use_local(monkeypatch, error):
+    monkeypatch.setattr(birdphoto, 'photo_classifier', Loaded(FailingLocal(error)))
+
+
+def test_runtime_failure_falls_back_to_remote(monkeypatch, remote):
+    use_local(monkeypatch, RuntimeError('onnxruntime exploded'))
+    results, version = birdphoto.classify_photo(b'image')
+    assert results[0]['label'] == 'HOUSE SPARROW' and version == 'remote'
+    assert remote.calls == 1
+
+
+def test_invalid_image_does_not_fall_back(monkeypatch, remote):
+    use_local(monkeypatch, InvalidImageError('Not a valid image'))
+    with pytest.raises(InvalidImageError):
+        birdphoto.classify_photo(b'image')
+    assert remote.calls == 0
+
+
+def test_undecodable_upload_is_rejected_with_400(monkeypatch, remote):
+    use_local(monkeypatch, RuntimeError('should not be called'))
+    app = Flask(__name__)
+    with app.test_request_context('/', method='POST',
+                                  data={'image': (io.BytesIO(b'%PDF-1.4 not a photo'), 'bird.jpg')}):
+        from flask import request
+        body, status = birdphoto.analyze_bird_photo(request, None)
+    assert status == 400 and 'Not a valid image' in body['error']
+    assert remote.calls == 0
+
+
+def test_fallback_results_are_not_cached_under_the_local_version(monkeypatch, remote):
+    use_local(monkeypatch, RuntimeError('onnxruntime exploded'))
+    monkeypatch.setattr(birdphoto, 'photo_result_cache', ResultCache('bird_photo', 'test'))
+    photo = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(photo, 'PNG')
+    app = Flask(__name__)
+    for _ in range(2):
+        with app.test_request_context('/', method='POST',
+                                      data={'image': (io.BytesIO(photo.getvalue()), 'bird.png')}):
+            from flask import request
+            body = birdphoto.analyze_bird_photo(request, None)
+        assert body[0]['species'] == 'HOUSE SPARROW'
+    assert remote.calls == 2
@@ -0,0 +1,133 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils import http_client
+from utils.http_client import CircuitOpenError, OutboundHTTP
+import asyncio
+import httpx
+import pytest
+import threading
+import time
+
+
+class StubServer:
+    """Local HTTP server answering each request with the next queued (status, body, headers, delay)"""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                status, body, headers, delay = stub.responses.pop(0) if stub.responses else (200, b'ok', {}, 0)
+                threading.Event().wait(delay)  # time.sleep is patched out by the sleeps fixture
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def queue(self, *statuses, body=b'ok', headers=None, delay=0):
+        self.responses.extend((status, body, headers or {}, delay) for status in statuses)
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff sleeps instead of waiting"""
+    delays = []
+    monkeypatch.setattr(http_client.time, 'sleep', delays.append)
+    return delays
+
+
+def breaker_state(http, url):
+    return http.stats()[url.split('/')[2]]['state']
+
+
+def test_retries_5xx_with_bounded_backoff(stub, sleeps):
+    http = OutboundHTTP(retries=3, backoff_base=0.5, backoff_max=1.0, breaker_threshold=10)
+    stub.queue(503, 502, 429)
+
+    response = http.request('GET', stub.url)
+
+    assert response.status_code == 200 and stub.requests == 4
+    assert len(sleeps) == 3 and all(0 <= delay <= cap for delay, cap in zip(sleeps, [0.5, 1.0, 1.0]))
+    assert breaker_state(http, stub.url) == 'closed'
+
+
+def test_gives_up_after_retries_with_last_response(stub, sleeps):
+    http = OutboundHTTP(retries=1, breaker_threshold=10)
+    stub.queue(500, 503)
+
+    assert http.request('GET', stub.url).status_code == 503
+    assert stub.requests == 2 and len(sleeps) == 1
+
+
+def test_breaker_opens_half_opens_and_closes(stub, sleeps):
+    http = OutboundHTTP(retries=0, breaker_threshold=2, breaker_reset=0.2)
+    stub.queue(500, 500)
+    http.request('GET', stub.url)
+    http.request('GET', stub.url)
+    assert breaker_state(http, stub.url) == 'open'
+
+    with pytest.raises(CircuitOpenError):
+        http.request('GET', stub.url)
+    assert stub.requests == 2
+
+    threading.Event().wait(0.25)
+    assert breaker_state(http, stub.url) == 'half_open'
+    # A failed trial re-opens the circuit
+    stub.queue(503)
+    http.request('GET', stub.url)
+    assert breaker_state(http, stub.url) == 'open'
+
+    threading.Event().wait(0.25)
+    assert http.request('GET', stub.url).status_code == 200
+    assert breaker_state(http, stub.url) == 'closed'
+
+
+def test_trial_without_verdict_releases_half_open_circuit(stub, sleeps):
+    http = OutboundHTTP(retries=0, breaker_threshold=1, breaker_reset=0.1)
+    stub.queue(500)
+    http.request('GET', stub.url)
+    threading.Event().wait(0.15)
+
+    # A body that cannot be decoded raises DecodingError, which is not a TransportError
+    stub.queue(200, body=b'not gzip', headers={'Content-Encoding': 'gzip'})
+    with pytest.raises(httpx.DecodingError):
+        http.request('GET', stub.url)
+    assert http.request('GET', stub.url).status_code == 200
+    assert breaker_state(http, stub.url) == 'closed'
+
+
+def test_cancelled_async_trial_releases_half_open_circuit(stub):
+    http = OutboundHTTP(retries=0, breaker_threshold=1, breaker_reset=0.1)
+
+    async def scenario():
+        stub.queue(500)
+        await http.arequest('GET', stub.url)
+        await asyncio.sleep(0.15)
+
+        stub.queue(200, delay=1.0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(http.arequest('GET', stub.url), 0.2)
+        return (await http.arequest('GET', stub.url)).status_code
+
+    assert asyncio.run(scenario()) == 200
+    assert breaker_state(http, stub.url) == 'closed'
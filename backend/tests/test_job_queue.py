@@ -0,0 +1,131 @@
+from services.job_queue import JobQueue
+import pytest
+import threading
+import time
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(**options):
+        queue = JobQueue(str(tmp_path / 'jobs.sqlite3'), **{'workers': 0, **options})
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.stop()
+
+
+def wait_for(queue, job_id, statuses=('done', 'failed', 'cancelled'), timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'job {job_id} still {queue.get(job_id)["status"]}')
+
+
+def test_claims_highest_priority_then_oldest(make_queue):
+    queue = make_queue()
+    queue.register('echo', lambda job: job.payload)
+    low = queue.submit('echo', {'n': 1})
+    high = queue.submit('echo', {'n': 2}, priority=5)
+    low_later = queue.submit('echo', {'n': 3})
+
+    assert queue.get(low_later)['queue_position'] == 2
+    assert [queue._claim()[0] for _ in range(3)] == [high, low, low_later]
+    assert queue._claim() is None
+
+
+def test_workers_run_jobs_and_store_results(make_queue):
+    events = []
+    queue = make_queue(workers=2, emit=lambda event, data, room: events.append((event, data['status'], room)))
+    queue.register('square', lambda job: job.payload['n'] ** 2)
+    queue.register('boom', lambda job: 1 / 0)
+    queue.start()
+
+    square = queue.submit('square', {'n': 7}, socket_id='sid-1')
+    boom = queue.submit('boom', {})
+
+    assert wait_for(queue, square)['result'] == 49
+    failed = wait_for(queue, boom)
+    assert failed['status'] == 'failed' and 'division' in failed['error']
+    assert ('job_update', 'done', 'sid-1') in events
+    with pytest.raises(ValueError):
+        queue.submit('unknown', {})
+
+
+def test_expired_lease_requeues_then_fails_with_cleanup(make_queue):
+    cleaned = []
+    queue = make_queue(lease=0.05, max_attempts=2)
+    queue.register('upload', lambda job: None, cleanup=cleaned.append)
+    job_id = queue.submit('upload', {'files': ['a.pdf']})
+
+    # Claimed by a "worker" that never renews its lease, twice
+    assert queue._claim()[0] == job_id
+    time.sleep(0.1)
+    assert queue._claim()[0] == job_id
+    assert queue.get(job_id)['attempts'] == 2 and cleaned == []
+    time.sleep(0.1)
+
+    assert queue._claim() is None
+    job = queue.get(job_id)
+    assert job['status'] == 'failed' and job['error'] == 'Worker lost too many times'
+    assert cleaned == [{'files': ['a.pdf']}]
+
+
+def test_cancel_queued_and_running_jobs(make_queue):
+    cleaned = []
+    started = threading.Event()
+
+    def slow(job):
+        started.set()
+        while True:
+            job.progress(step='waiting')
+            time.sleep(0.02)
+
+    queue = make_queue(workers=1)
+    queue.register('slow', slow, cleanup=cleaned.append)
+    queue.start()
+    running = queue.submit('slow', {'n': 1})
+    assert started.wait(5)
+    queued = queue.submit('slow', {'n': 2})
+
+    assert queue.cancel(queued)
+    assert queue.get(queued)['status'] == 'cancelled'
+    assert queue.cancel(running)
+    assert wait_for(queue, running)['status'] == 'cancelled'
+    assert sorted(p['n'] for p in cleaned) == [1, 2]
+    assert not queue.cancel(running)
+    assert not queue.cancel('no-such-job')
+
+
+def test_run_that_lost_its_lease_leaves_the_job_alone(make_queue):
+    cleaned, events = [], []
+    first = make_queue(lease=0.05, emit=lambda event, data, room: events.append(data['status']))
+    second = make_queue(lease=60)
+    second.owner = 'other-host:1'
+    for queue in (first, second):
+        queue.register('upload', lambda job: 'stale result', cleanup=cleaned.append)
+    job_id = first.submit('upload', {'files': ['a.pdf']}, socket_id='sid')
+
+    stale = first._claim()
+    time.sleep(0.1)
+    assert second._claim()[0] == job_id
+
+    first._run(*stale)
+    job = first.get(job_id)
+    assert job['status'] == 'running' and job['result'] is None
+    assert cleaned == [] and 'done' not in events
+
+
+def test_invalid_priority_is_a_value_error(make_queue):
+    queue = make_queue()
+    queue.register('echo', lambda job: None)
+    assert queue.get(queue.submit('echo', {}, priority='3'))['priority'] == 3
+    for priority in ('high', None, [1]):
+        with pytest.raises(ValueError):
+            queue.submit('echo', {}, priority=priority)
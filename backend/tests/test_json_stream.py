@@ -0,0 +1,37 @@
+from utils.json_stream import JSONObjectStream, repair_json
+
+
+def feed_all(text, step=3):
+    stream = JSONObjectStream()
+    objects = []
+    for i in range(0, len(text), step):
+        objects.extend(stream.feed(text[i:i + step]))
+    return stream, objects
+
+
+def test_objects_close_as_they_stream():
+    stream, objects = feed_all('```json\n[{"q": "a {b}"}, {"q": "প্রশ্ন", "n": [1, 2]}]\n```')
+    assert objects == [{'q': 'a {b}'}, {'q': 'প্রশ্ন', 'n': [1, 2]}]
+    assert stream.close() == [] and stream.skipped == 0
+
+
+def test_repairs_llm_style_objects_and_skips_broken_ones():
+    stream, objects = feed_all("[{'q': 'x', 'ok': true,}, {\"q\": oops}, {\"q\": \"y\"}]")
+    assert objects == [{'q': 'x', 'ok': True}, {'q': 'y'}]
+    assert stream.skipped == 1
+
+
+def test_close_salvages_an_object_cut_in_a_string():
+    stream, objects = feed_all('[{"q": "a"}, {"q": "b", "hints": ["one", "tw')
+    assert objects == [{'q': 'a'}]
+    assert stream.close() == [{'q': 'b', 'hints': ['one', 'tw']}]
+
+
+def test_close_drops_a_key_without_value():
+    for tail in ('"opt', '"options"', '"options": '):
+        stream, _ = feed_all('{"questions": [{"q": "a"}, {"q": "b", ' + tail)
+        assert stream.close() == [{'questions': [{'q': 'a'}, {'q': 'b'}]}]
+
+
+def test_repair_json_returns_none_for_garbage():
+    assert repair_json('not json at all') is None
@@ -0,0 +1,98 @@
+from PIL import Image
+from services.photo_classifier import LocalPhotoClassifier, OnnxPhotoClassifier, create_photo_classifier
+import io
+import json
+import pytest
+
+onnx = pytest.importorskip('onnx')
+pytest.importorskip('onnxruntime')
+
+LABELS = ['RED TAILED HAWK', 'GREEN JAY', 'BLUE JAY']
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A snapshot with three labels and 4x4 inputs scaled to [0, 1]"""
+    (tmp_path / 'config.json').write_text(json.dumps({'id2label': {str(i): label for i, label in enumerate(LABELS)}}))
+    (tmp_path / 'preprocessor_config.json').write_text(json.dumps({
+        'size': {'width': 4, 'height': 4},
+        'rescale_factor': 1 / 255,
+        'image_mean': [0.0, 0.0, 0.0],
+        'image_std': [1.0, 1.0, 1.0]
+    }))
+    return tmp_path
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """Dummy ONNX model whose logits are the mean of each colour channel"""
+    from onnx import TensorProto, helper
+
+    graph = helper.make_graph(
+        [helper.make_node('ReduceMean', ['pixel_values'], ['logits'], axes=[2, 3], keepdims=0)],
+        'dummy-bird-classifier',
+        [helper.make_tensor_value_info('pixel_values', TensorProto.FLOAT, ['batch', 3, 4, 4])],
+        [helper.make_tensor_value_info('logits', TensorProto.FLOAT, ['batch', 3])]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)], ir_version=8)
+    path = tmp_path / 'model.onnx'
+    onnx.save(model, str(path))
+    return str(path)
+
+
+def image_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class FakeRemote:
+    backend = 'remote'
+
+
+def test_onnx_backend_classifies_with_dummy_model(model_path, model_dir):
+    classifier = create_photo_classifier('onnx', model_path, str(model_dir), FakeRemote(), top_k=2)
+
+    assert isinstance(classifier, OnnxPhotoClassifier)
+    assert classifier.version == 'onnx:model.onnx'
+    top = classifier.classify(image_bytes((255, 0, 0)))
+    assert top[0]['label'] == 'RED TAILED HAWK'
+    assert len(top) == 2
+
+    results = classifier.classify_many([image_bytes((0, 255, 0)), image_bytes((0, 0, 255))])
+    assert [r[0]['label'] for r in results] == ['GREEN JAY', 'BLUE JAY']
+    assert sum(p['score'] for p in results[0]) <= 1.0
+
+
+def test_missing_model_falls_back_to_remote(tmp_path, model_dir):
+    remote = FakeRemote()
+    assert create_photo_classifier('onnx', str(tmp_path / 'missing.onnx'), str(model_dir), remote) is remote
+
+
+def test_unloadable_model_falls_back_to_remote(tmp_path, model_dir):
+    broken = tmp_path / 'broken.onnx'
+    broken.write_bytes(b'not an onnx model')
+    remote = FakeRemote()
+    assert create_photo_classifier('onnx', str(broken), str(model_dir), remote) is remote
+
+
+def test_remote_backend_and_unknown_backend(model_path, model_dir):
+    remote = FakeRemote()
+    assert create_photo_classifier('remote', model_path, str(model_dir), remote) is remote
+    with pytest.raises(ValueError):
+        create_photo_classifier('coreml', model_path, str(model_dir), remote)
+
+
+def test_local_classifier_requires_predict_batch(model_path, model_dir):
+    with pytest.raises(TypeError):
+        LocalPhotoClassifier(model_path, str(model_dir))
+
+
+def test_validate_image_rejects_undecodable_bytes():
+    from services.photo_classifier import InvalidImageError, validate_image
+
+    validate_image(image_bytes((0, 0, 0)))
+    with pytest.raises(InvalidImageError):
+        validate_image(b'GIF89a not really')
+    with pytest.raises(InvalidImageError):
+        validate_image(image_bytes((0, 0, 0))[:40])